@@ -71,11 +71,11 @@ def trace_llm(
         @wraps(func)
         def wrapper(*args, **kwargs):
             telemetry = _get_telemetry()
-            start = time.time()
+            start = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 
                 # Extract tokens using the helper function
                 input_tokens, output_tokens = extract_tokens_from_response(result)
@@ -98,7 +98,7 @@ def trace_llm(
                 return result
                 
             except Exception as e:
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 telemetry.send_span(
                     span_type="LLM",
                     name=func.__name__,
@@ -121,11 +121,11 @@ def trace_embedding(model: str) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             telemetry = _get_telemetry()
-            start = time.time()
+            start = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 
                 # Try to extract token usage from embedding response
                 input_tokens = 0
@@ -144,7 +144,7 @@ def trace_embedding(model: str) -> Callable:
                 return result
                 
             except Exception as e:
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 telemetry.send_span(
                     span_type="EMBEDDING",
                     name=func.__name__,
@@ -165,11 +165,11 @@ def trace_retrieval(vector_store: str, embedding_model: str = None) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             telemetry = _get_telemetry()
-            start = time.time()
+            start = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 
                 docs_count = len(result) if isinstance(result, (list, tuple)) else 0
                 
@@ -184,7 +184,7 @@ def trace_retrieval(vector_store: str, embedding_model: str = None) -> Callable:
                 return result
                 
             except Exception as e:
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 telemetry.send_span(
                     span_type="RETRIEVER",
                     name=func.__name__,
@@ -205,11 +205,11 @@ def trace_tool(tool_name: str) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             telemetry = _get_telemetry()
-            start = time.time()
+            start = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 
                 telemetry.send_span(
                     span_type="TOOL",
@@ -220,7 +220,7 @@ def trace_tool(tool_name: str) -> Callable:
                 return result
                 
             except Exception as e:
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 telemetry.send_span(
                     span_type="TOOL",
                     name=func.__name__,
@@ -242,11 +242,11 @@ def trace_chain(name: str) -> Callable:
         def wrapper(*args, **kwargs):
             telemetry = _get_telemetry()
             telemetry.new_trace()
-            start = time.time()
+            start = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 
                 telemetry.send_span(
                     span_type="CHAIN",
@@ -256,7 +256,7 @@ def trace_chain(name: str) -> Callable:
                 return result
                 
             except Exception as e:
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 telemetry.send_span(
                     span_type="CHAIN",
                     name=name,
@@ -277,11 +277,11 @@ def trace_agent(agent_name: str, agent_type: str = None) -> Callable:
         def wrapper(*args, **kwargs):
             telemetry = _get_telemetry()
             telemetry.new_trace()
-            start = time.time()
+            start = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 
                 telemetry.send_span(
                     span_type="AGENT",
@@ -293,7 +293,7 @@ def trace_agent(agent_name: str, agent_type: str = None) -> Callable:
                 return result
                 
             except Exception as e:
-                duration = round((time.time() - start) * 1000, 2)
+                duration = round((time.perf_counter() - start) * 1000, 2)
                 telemetry.send_span(
                     span_type="AGENT",
                     name=func.__name__,
@@ -7,10 +7,26 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+# Fields included in to_dict() only when set to a non-empty, non-zero value
+_OPTIONAL_FIELDS = (
+    "workflow_name", "parent_span_id", "error_message", "error_type",
+    "model_name", "model_provider", "input_tokens", "output_tokens",
+    "temperature", "max_tokens", "embedding_model", "embedding_dimensions",
+    "vector_store", "documents_retrieved", "relevance_score",
+    "tool_name", "agent_name", "agent_type"
+)
+
 
 class Span:
     """Represents a single span in a trace."""
     
+    # Slots make attribute access cheaper and spans smaller; custom data
+    # belongs in `attributes`
+    __slots__ = (
+        "trace_id", "span_id", "name", "span_type", "start_time", "start_time_ns", "end_time",
+        "duration_ms", "status", "is_error", "attributes", "_start_perf",
+    ) + _OPTIONAL_FIELDS
+    
     def __init__(
         self,
         trace_id: str,
@@ -27,7 +43,11 @@ class Span:
         self.span_type = span_type
         self.workflow_name = workflow_name
         self.parent_span_id = parent_span_id
-        self.start_time = time.time()
+        self.start_time_ns = time.time_ns()
+        self.start_time = self.start_time_ns / 1e9
+        # Durations come from the monotonic clock, so wall-clock steps can't
+        # make them negative or inflated
+        self._start_perf = time.perf_counter()
         self.end_time: Optional[float] = None
         self.duration_ms: Optional[float] = None
         self.status = "OK"
@@ -76,7 +96,7 @@ class Span:
     def finish(self, error: Exception = None) -> None:
         """Complete the span."""
         self.end_time = time.time()
-        self.duration_ms = round((self.end_time - self.start_time) * 1000, 2)
+        self.duration_ms = round((time.perf_counter() - self._start_perf) * 1000, 2)
         if error:
             self.set_error(error)
     
@@ -88,21 +108,14 @@ class Span:
             "name": self.name,
             "span_type": self.span_type,
             "timestamp": datetime.fromtimestamp(self.start_time, tz=timezone.utc).isoformat(),
+            "start_time_ns": self.start_time_ns,
             "duration_ms": self.duration_ms or 0,
             "status": self.status,
             "is_error": self.is_error,
         }
         
-        optional_fields = [
-            "workflow_name", "parent_span_id", "error_message", "error_type",
-            "model_name", "model_provider", "input_tokens", "output_tokens",
-            "temperature", "max_tokens", "embedding_model", "embedding_dimensions",
-            "vector_store", "documents_retrieved", "relevance_score",
-            "tool_name", "agent_name", "agent_type"
-        ]
-        
-        for field in optional_fields:
-            value = getattr(self, field, None)
+        for field in _OPTIONAL_FIELDS:
+            value = getattr(self, field)
             if value is not None and value != "" and value != 0:
                 data[field] = value
         
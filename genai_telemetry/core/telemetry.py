@@ -2,15 +2,36 @@
 Main telemetry manager and setup functions.
 """
 
+import os
+import random
 import threading
-import uuid
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Union
+from functools import singledispatch
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from genai_telemetry.core.span import Span
 from genai_telemetry.exporters.base import BaseExporter
 
+# Private generator seeded from the OS, so an application calling
+# random.seed() does not make trace and span IDs repeat across runs.
+# Reseeded after fork so child processes don't share a sequence.
+_random = random.Random(os.urandom(16))
+_getrandbits = _random.getrandbits
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _random.seed(os.urandom(16)))
+
+
+def _new_trace_id() -> str:
+    """Generate a random 128-bit trace ID as 32 hex characters."""
+    return f"{_getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    """Generate a random 64-bit span ID as 16 hex characters."""
+    return f"{_getrandbits(64):016x}"
+
 
 class GenAITelemetry:
     """Main telemetry manager."""
@@ -30,7 +51,7 @@ class GenAITelemetry:
     @property
     def trace_id(self) -> str:
         if not hasattr(self._trace_id, "value") or self._trace_id.value is None:
-            self._trace_id.value = uuid.uuid4().hex
+            self._trace_id.value = _new_trace_id()
         return self._trace_id.value
     
     @trace_id.setter
@@ -45,7 +66,7 @@ class GenAITelemetry:
     
     def new_trace(self) -> str:
         """Start a new trace."""
-        self._trace_id.value = uuid.uuid4().hex
+        self._trace_id.value = _new_trace_id()
         return self._trace_id.value
     
     def current_span(self) -> Optional[Span]:
@@ -59,7 +80,7 @@ class GenAITelemetry:
         
         span = Span(
             trace_id=self.trace_id,
-            span_id=uuid.uuid4().hex[:16],
+            span_id=_new_span_id(),
             name=name,
             span_type=span_type,
             workflow_name=self.workflow_name,
@@ -77,7 +98,7 @@ class GenAITelemetry:
             raise
         finally:
             self.span_stack.pop()
-            self.exporter.export(span.to_dict())
+            self.exporter.export_span(span)
     
     def send_span(self, span_type: str, name: str, duration_ms: float = None, **kwargs) -> bool:
         """Send a span directly."""
@@ -85,7 +106,7 @@ class GenAITelemetry:
         
         span_data = {
             "trace_id": self.trace_id,
-            "span_id": uuid.uuid4().hex[:16],
+            "span_id": _new_span_id(),
             "parent_span_id": parent_id,
             "span_type": span_type,
             "name": name,
@@ -109,6 +130,22 @@ class GenAITelemetry:
 
 _telemetry: Optional[GenAITelemetry] = None
 
+# Per-context instance, so concurrent asyncio tasks can run separately
+# configured pipelines. Falls back to _telemetry in contexts (e.g. new
+# threads) where setup_telemetry was never called.
+_telemetry_ctx: ContextVar[Optional[GenAITelemetry]] = ContextVar(
+    "genai_telemetry", default=None
+)
+
+# Alternative names accepted for exporter types
+_ALIASES = {
+    "es": "elasticsearch",
+    "elastic": "elasticsearch",
+    "opentelemetry": "otlp",
+    "otel": "otlp",
+    "aws": "cloudwatch",
+}
+
 
 def setup_telemetry(
     workflow_name: str,
@@ -186,74 +223,52 @@ def setup_telemetry(
     global _telemetry
     
     # Import exporters here to avoid circular imports
-    from genai_telemetry.exporters.splunk import SplunkHECExporter
-    from genai_telemetry.exporters.elasticsearch import ElasticsearchExporter
-    from genai_telemetry.exporters.otlp import OTLPExporter
-    from genai_telemetry.exporters.datadog import DatadogExporter
-    from genai_telemetry.exporters.prometheus import PrometheusExporter
-    from genai_telemetry.exporters.loki import LokiExporter
-    from genai_telemetry.exporters.cloudwatch import CloudWatchExporter
     from genai_telemetry.exporters.console import ConsoleExporter
-    from genai_telemetry.exporters.file import FileExporter
-    from genai_telemetry.exporters.multi import MultiExporter
-    
-    exporters = []
-    
-    # Handle list of exporters
-    if isinstance(exporter, list):
-        for exp_config in exporter:
-            exp_type = exp_config.get("type", "console")
-            exp_instance = _create_exporter(exp_type, exp_config)
-            if exp_instance:
-                exporters.append(exp_instance)
-    
-    # Handle string exporter type
-    elif isinstance(exporter, str):
-        config = {
-            "splunk_url": splunk_url,
-            "splunk_token": splunk_token,
-            "splunk_index": splunk_index,
-            "es_hosts": es_hosts,
-            "es_index": es_index,
-            "es_api_key": es_api_key,
-            "es_username": es_username,
-            "es_password": es_password,
-            "otlp_endpoint": otlp_endpoint,
-            "otlp_headers": otlp_headers,
-            "datadog_api_key": datadog_api_key,
-            "datadog_site": datadog_site,
-            "prometheus_gateway": prometheus_gateway,
-            "loki_url": loki_url,
-            "loki_tenant_id": loki_tenant_id,
-            "cloudwatch_log_group": cloudwatch_log_group,
-            "cloudwatch_region": cloudwatch_region,
-            "file_path": file_path,
-            "verify_ssl": verify_ssl,
-            "batch_size": batch_size,
-            "flush_interval": flush_interval,
-            "service_name": service_name or workflow_name,
-        }
-        exp_instance = _create_exporter(exporter, config)
-        if exp_instance:
-            exporters.append(exp_instance)
-    
-    # Handle direct exporter instance
-    elif isinstance(exporter, BaseExporter):
-        exporters.append(exporter)
     
-    # Add console if requested
+    exporters = _build_exporters(exporter, lambda: {
+        "splunk_url": splunk_url,
+        "splunk_token": splunk_token,
+        "splunk_index": splunk_index,
+        "es_hosts": es_hosts,
+        "es_index": es_index,
+        "es_api_key": es_api_key,
+        "es_username": es_username,
+        "es_password": es_password,
+        "otlp_endpoint": otlp_endpoint,
+        "otlp_headers": otlp_headers,
+        "datadog_api_key": datadog_api_key,
+        "datadog_site": datadog_site,
+        "prometheus_gateway": prometheus_gateway,
+        "loki_url": loki_url,
+        "loki_tenant_id": loki_tenant_id,
+        "cloudwatch_log_group": cloudwatch_log_group,
+        "cloudwatch_region": cloudwatch_region,
+        "file_path": file_path,
+        "verify_ssl": verify_ssl,
+        "batch_size": batch_size,
+        "flush_interval": flush_interval,
+        "service_name": service_name or workflow_name,
+    })
+    
+    # Add console if requested; isinstance so subclasses count as present
     if console and not any(isinstance(e, ConsoleExporter) for e in exporters):
         exporters.append(ConsoleExporter())
     
     # Add file if requested
-    if file_path and not any(isinstance(e, FileExporter) for e in exporters):
-        exporters.append(FileExporter(file_path))
+    if file_path:
+        from genai_telemetry.exporters.file import FileExporter
+        if not any(isinstance(e, FileExporter) for e in exporters):
+            exporters.append(FileExporter(file_path))
     
     if not exporters:
         exporters.append(ConsoleExporter())
     
     # Create final exporter
-    final_exporter = MultiExporter(exporters) if len(exporters) > 1 else exporters[0]
+    if len(exporters) > 1:
+        from genai_telemetry.exporters.multi import MultiExporter
+        final_exporter = MultiExporter(exporters)
+    else:
+        final_exporter = exporters[0]
     final_exporter.start()
     
     _telemetry = GenAITelemetry(
@@ -261,10 +276,52 @@ def setup_telemetry(
         exporter=final_exporter,
         service_name=service_name
     )
+    _telemetry_ctx.set(_telemetry)
     
     return _telemetry
 
 
+@singledispatch
+def _build_exporters(exporter: Any, make_config: Callable[[], dict]) -> List[BaseExporter]:
+    """
+    Build exporter instances from the `exporter` argument of setup_telemetry.
+    
+    Args:
+        exporter: Exporter type, instance, or list of exporter configs
+        make_config: Builds the config for a string exporter type on demand
+    """
+    return []
+
+
+@_build_exporters.register(list)
+def _build_exporters_from_list(exporter: list, make_config: Callable[[], dict]) -> List[BaseExporter]:
+    exporters = []
+    for exp_config in exporter:
+        exp_type = exp_config.get("type", "console")
+        exp_instance = _create_exporter(exp_type, exp_config)
+        if exp_instance:
+            exporters.append(exp_instance)
+    return exporters
+
+
+@_build_exporters.register(str)
+def _build_exporters_from_str(exporter: str, make_config: Callable[[], dict]) -> List[BaseExporter]:
+    # Console ignores every backend option, so skip building the config
+    if exporter == "console":
+        from genai_telemetry.exporters.console import ConsoleExporter
+        return [ConsoleExporter()]
+    
+    exp_instance = _create_exporter(exporter, make_config())
+    return [exp_instance] if exp_instance else []
+
+
+@_build_exporters.register(BaseExporter)
+def _build_exporters_from_instance(
+    exporter: BaseExporter, make_config: Callable[[], dict]
+) -> List[BaseExporter]:
+    return [exporter]
+
+
 def _create_exporter(exporter_type: str, config: dict) -> Optional[BaseExporter]:
     """Create an exporter instance from type and config."""
     # Import exporters here to avoid circular imports
@@ -279,6 +336,7 @@ def _create_exporter(exporter_type: str, config: dict) -> Optional[BaseExporter]
     from genai_telemetry.exporters.file import FileExporter
     
     exporter_type = exporter_type.lower()
+    exporter_type = _ALIASES.get(exporter_type, exporter_type)
     
     if exporter_type == "splunk":
         url = config.get("splunk_url") or config.get("url")
@@ -294,7 +352,7 @@ def _create_exporter(exporter_type: str, config: dict) -> Optional[BaseExporter]
             flush_interval=config.get("flush_interval", 5.0)
         )
     
-    elif exporter_type in ("elasticsearch", "es", "elastic"):
+    elif exporter_type == "elasticsearch":
         hosts = config.get("es_hosts") or config.get("hosts")
         if not hosts:
             hosts = ["http://localhost:9200"]
@@ -309,7 +367,7 @@ def _create_exporter(exporter_type: str, config: dict) -> Optional[BaseExporter]
             flush_interval=config.get("flush_interval", 5.0)
         )
     
-    elif exporter_type in ("otlp", "opentelemetry", "otel"):
+    elif exporter_type == "otlp":
         endpoint = config.get("otlp_endpoint") or config.get("endpoint", "http://localhost:4318")
         return OTLPExporter(
             endpoint=endpoint,
@@ -348,7 +406,7 @@ def _create_exporter(exporter_type: str, config: dict) -> Optional[BaseExporter]
             flush_interval=config.get("flush_interval", 5.0)
         )
     
-    elif exporter_type in ("cloudwatch", "aws"):
+    elif exporter_type == "cloudwatch":
         log_group = config.get("cloudwatch_log_group") or config.get("log_group", "/genai/traces")
         return CloudWatchExporter(
             log_group=log_group,
@@ -372,7 +430,8 @@ def _create_exporter(exporter_type: str, config: dict) -> Optional[BaseExporter]
 
 
 def get_telemetry() -> GenAITelemetry:
-    """Get the telemetry instance."""
-    if _telemetry is None:
+    """Get the telemetry instance for the current context."""
+    telemetry = _telemetry_ctx.get() or _telemetry
+    if telemetry is None:
         raise RuntimeError("Call setup_telemetry() first")
-    return _telemetry
+    return telemetry
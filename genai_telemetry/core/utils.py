@@ -2,7 +2,59 @@
 Utility functions for token and content extraction from LLM responses.
 """
 
-from typing import Any, Tuple
+import weakref
+from typing import Any, Callable, Optional, Tuple
+
+
+def _tokens_from_usage_metadata(response: Any) -> Tuple[int, int]:
+    """LangChain AIMessage - usage_metadata dict."""
+    usage = response.usage_metadata
+    if not isinstance(usage, dict):
+        raise TypeError("usage_metadata is not a dict")
+    return (usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0)
+
+
+def _tokens_from_prompt_usage(response: Any) -> Tuple[int, int]:
+    """OpenAI ChatCompletion / Completion - usage.prompt_tokens."""
+    usage = response.usage
+    prompt_tokens = usage.prompt_tokens
+    if prompt_tokens is None:
+        raise TypeError("prompt_tokens is not set")
+    return (prompt_tokens or 0, getattr(usage, "completion_tokens", 0) or 0)
+
+
+def _tokens_from_input_usage(response: Any) -> Tuple[int, int]:
+    """Anthropic Message - usage.input_tokens."""
+    usage = response.usage
+    input_tokens = usage.input_tokens
+    if input_tokens is None:
+        raise TypeError("input_tokens is not set")
+    return (input_tokens or 0, getattr(usage, "output_tokens", 0) or 0)
+
+
+# Access path that matched last time, keyed by response type
+_TOKEN_EXTRACTORS: "weakref.WeakKeyDictionary[type, Callable[[Any], Tuple[int, int]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _resolve_token_extractor(response: Any) -> Optional[Callable[[Any], Tuple[int, int]]]:
+    """Probe a response object for a usage path that is safe to remember for its type."""
+    if isinstance(getattr(response, "usage_metadata", None), dict):
+        return _tokens_from_usage_metadata
+    # LangChain messages without usage_metadata fall back to several
+    # locations; leave those to the full probe
+    if hasattr(response, "usage_metadata"):
+        return None
+    
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        if getattr(usage, "prompt_tokens", None) is not None:
+            return _tokens_from_prompt_usage
+        if getattr(usage, "input_tokens", None) is not None:
+            return _tokens_from_input_usage
+    
+    return None
 
 
 def extract_tokens_from_response(response: Any) -> Tuple[int, int]:
@@ -22,6 +74,28 @@ def extract_tokens_from_response(response: Any) -> Tuple[int, int]:
     Returns:
         tuple: (input_tokens, output_tokens)
     """
+    if isinstance(response, dict):
+        return _extract_tokens_uncached(response)
+    
+    # The usage path is remembered per response type, so repeated calls with
+    # the same client's responses skip the full probe
+    response_type = type(response)
+    extractor = _TOKEN_EXTRACTORS.get(response_type)
+    if extractor is not None:
+        try:
+            return extractor(response)
+        except (AttributeError, TypeError):
+            pass
+    
+    extractor = _resolve_token_extractor(response)
+    if extractor is None:
+        return _extract_tokens_uncached(response)
+    _TOKEN_EXTRACTORS[response_type] = extractor
+    return extractor(response)
+
+
+def _extract_tokens_uncached(response: Any) -> Tuple[int, int]:
+    """Probe every known usage location in precedence order."""
     input_tokens = 0
     output_tokens = 0
     
@@ -90,10 +164,91 @@ def extract_tokens_from_response(response: Any) -> Tuple[int, int]:
     return (input_tokens, output_tokens)
 
 
+def _content_from_string_attr(response: Any) -> str:
+    """LangChain AIMessage - has content as string directly."""
+    content = response.content
+    if not isinstance(content, str):
+        raise TypeError("content is not a string")
+    return content
+
+
+def _content_from_message(response: Any) -> str:
+    """OpenAI ChatCompletion."""
+    return response.choices[0].message.content or ""
+
+
+def _content_from_text(response: Any) -> str:
+    """Legacy OpenAI completion format."""
+    return response.choices[0].text or ""
+
+
+def _content_from_blocks(response: Any) -> str:
+    """Anthropic Message - content is a list of blocks."""
+    # The same type may carry str or list content (LangChain AIMessage);
+    # reject strings so the cached path is re-probed instead of iterated
+    content = response.content
+    if not isinstance(content, list):
+        raise TypeError("content is not a list of blocks")
+    texts = []
+    for block in content:
+        if hasattr(block, "text"):
+            texts.append(block.text)
+    return "".join(texts)
+
+
+# Access path that matched last time, keyed by response type
+_CONTENT_EXTRACTORS: "weakref.WeakKeyDictionary[type, Callable[[Any], str]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _resolve_content_extractor(response: Any) -> Optional[Callable[[Any], str]]:
+    """Probe a response object for the attribute path holding its content."""
+    if hasattr(response, "content") and isinstance(response.content, str):
+        return _content_from_string_attr
+    
+    if hasattr(response, "choices") and response.choices:
+        choice = response.choices[0]
+        if hasattr(choice, "message") and hasattr(choice.message, "content"):
+            return _content_from_message
+        if hasattr(choice, "text"):
+            return _content_from_text
+    
+    if hasattr(response, "content") and isinstance(response.content, list):
+        return _content_from_blocks
+    
+    return None
+
+
+def _extract_content_from_dict(response: dict) -> Optional[str]:
+    """Extract text content from a dict response."""
+    # OpenAI style
+    if "choices" in response and response["choices"]:
+        choice = response["choices"][0]
+        if "message" in choice:
+            return choice["message"].get("content", "")
+        if "text" in choice:
+            return choice.get("text", "")
+    # Anthropic style
+    if "content" in response and isinstance(response["content"], list):
+        texts = []
+        for block in response["content"]:
+            if isinstance(block, dict) and "text" in block:
+                texts.append(block["text"])
+        return "".join(texts)
+    # Simple content field
+    if "content" in response and isinstance(response["content"], str):
+        return response["content"]
+    return None
+
+
 def extract_content_from_response(response: Any, model_provider: str = "openai") -> str:
     """
     Extract text content from various LLM response formats.
     
+    The attribute path that yields the content is remembered per response
+    type, so repeated calls with the same client's responses skip probing.
+    
     Args:
         response: The LLM response object
         model_provider: The provider name (openai, anthropic, etc.)
@@ -105,48 +260,26 @@ def extract_content_from_response(response: Any, model_provider: str = "openai")
     if isinstance(response, str):
         return response
     
-    # LangChain AIMessage - has content as string directly
-    if hasattr(response, "content") and isinstance(response.content, str):
-        return response.content
-    
-    # OpenAI ChatCompletion
-    if hasattr(response, "choices") and response.choices:
-        choice = response.choices[0]
-        if hasattr(choice, "message") and hasattr(choice.message, "content"):
-            return choice.message.content or ""
-        # Legacy completion format
-        if hasattr(choice, "text"):
-            return choice.text or ""
-    
-    # Anthropic Message - content is a list of blocks
-    if hasattr(response, "content") and isinstance(response.content, list):
-        texts = []
-        for block in response.content:
-            if hasattr(block, "text"):
-                texts.append(block.text)
-        return "".join(texts)
-    
     # Dict response
     if isinstance(response, dict):
-        # OpenAI style
-        if "choices" in response and response["choices"]:
-            choice = response["choices"][0]
-            if "message" in choice:
-                return choice["message"].get("content", "")
-            if "text" in choice:
-                return choice.get("text", "")
-        # Anthropic style
-        if "content" in response and isinstance(response["content"], list):
-            texts = []
-            for block in response["content"]:
-                if isinstance(block, dict) and "text" in block:
-                    texts.append(block["text"])
-            return "".join(texts)
-        # Simple content field
-        if "content" in response and isinstance(response["content"], str):
-            return response["content"]
-    
-    return str(response)
+        content = _extract_content_from_dict(response)
+        return str(response) if content is None else content
+    
+    response_type = type(response)
+    extractor = _CONTENT_EXTRACTORS.get(response_type)
+    if extractor is not None:
+        try:
+            content = extractor(response)
+            if isinstance(content, str):
+                return content
+        except (AttributeError, IndexError, KeyError, TypeError):
+            pass
+    
+    extractor = _resolve_content_extractor(response)
+    if extractor is None:
+        return str(response)
+    _CONTENT_EXTRACTORS[response_type] = extractor
+    return extractor(response)
 
 
 # Aliases for backwards compatibility
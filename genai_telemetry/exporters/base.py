@@ -2,8 +2,194 @@
 Base exporter interface for all telemetry exporters.
 """
 
+import atexit
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger("genai_telemetry.exporters.base")
+
+
+def _json_dumpb(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a compact JSON string, using orjson when installed."""
+    return _json_dumpb(obj).decode("utf-8")
+
+
+def _json_dumps_indent(obj: Any) -> str:
+    """Serialize to a JSON string indented by two spaces, using orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2)
+
+
+def _split_by_size(
+    items: List[Any],
+    sizes: List[int],
+    max_items: int,
+    max_bytes: int
+) -> Iterator[List[Any]]:
+    """Split items into consecutive chunks bounded by item count and total size."""
+    chunk: List[Any] = []
+    chunk_bytes = 0
+    for item, size in zip(items, sizes):
+        if chunk and (len(chunk) >= max_items or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(item)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+class _FlushScheduler:
+    """
+    Single background thread that drives periodic flushes for all exporters.
+    
+    Exporters register a flush callback with an interval instead of running
+    their own sleep loop. Pending deadlines are kept in a heap so the thread
+    only wakes up when the nearest callback is due, or when an exporter
+    triggers an early flush because its batch is full. Due callbacks run on a
+    small worker pool, so one slow backend does not hold up the others; a
+    callback never runs concurrently with itself. A single atexit hook stops
+    every exporter that asked to be stopped on shutdown.
+    """
+    
+    def __init__(self, max_workers: int = 4):
+        self._heap: List[Tuple[float, int, float]] = []
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._due: set = set()
+        self._running: set = set()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="genai-telemetry-flush-worker"
+        )
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._exit_callbacks: List[Callable[[], None]] = []
+        atexit.register(self._run_exit_callbacks)
+    
+    def register(self, interval: float, callback: Callable[[], None]) -> int:
+        """
+        Schedule a callback to run every `interval` seconds.
+        
+        Returns:
+            int: Handle that can be passed to trigger() and unregister()
+        """
+        handle = next(self._counter)
+        with self._cond:
+            self._callbacks[handle] = callback
+            heapq.heappush(self._heap, (time.monotonic() + interval, handle, interval))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="genai-telemetry-flush", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return handle
+    
+    def trigger(self, handle: int) -> None:
+        """Run a registered callback as soon as possible, off the caller's thread."""
+        with self._cond:
+            if handle in self._callbacks and handle not in self._due:
+                self._due.add(handle)
+                self._cond.notify()
+    
+    def unregister(self, handle: int) -> None:
+        """Stop running a previously registered callback."""
+        with self._cond:
+            self._callbacks.pop(handle, None)
+            self._due.discard(handle)
+            self._cond.notify()
+    
+    def at_exit(self, callback: Callable[[], None]) -> None:
+        """Run a callback once at interpreter shutdown."""
+        with self._cond:
+            self._exit_callbacks.append(callback)
+    
+    def _run(self) -> None:
+        """Background loop that sleeps until a callback is triggered or due."""
+        while True:
+            with self._cond:
+                # Triggered callbacks that are still running stay pending
+                ready = self._due - self._running
+                if ready:
+                    handle = ready.pop()
+                    self._due.discard(handle)
+                    callback = self._callbacks.get(handle)
+                    if callback is None:
+                        continue
+                else:
+                    while self._heap and self._heap[0][1] not in self._callbacks:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, handle, interval = self._heap[0]
+                    delay = deadline - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heapreplace(self._heap, (time.monotonic() + interval, handle, interval))
+                    if handle in self._running:
+                        # Previous flush still in progress; skip this tick
+                        continue
+                    callback = self._callbacks[handle]
+                self._running.add(handle)
+            
+            try:
+                self._pool.submit(self._invoke, handle, callback)
+            except RuntimeError:
+                # Interpreter shutdown; the atexit hook flushes the exporters
+                return
+    
+    def _invoke(self, handle: int, callback: Callable[[], None]) -> None:
+        """Run a callback on a worker thread."""
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Scheduled flush error: {e}")
+        finally:
+            with self._cond:
+                self._running.discard(handle)
+                self._cond.notify()
+    
+    def _run_exit_callbacks(self) -> None:
+        """Invoke all shutdown callbacks."""
+        with self._cond:
+            callbacks = list(self._exit_callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Exporter shutdown error: {e}")
+
+
+_SCHEDULER = _FlushScheduler()
 
 
 class BaseExporter(ABC):
@@ -22,9 +208,24 @@ class BaseExporter(ABC):
         """
         pass
     
+    def export_span(self, span: Any) -> bool:
+        """
+        Export a finished Span object.
+        
+        Batching exporters override this to queue the Span itself, so
+        to_dict() runs on the flush thread instead of the traced call.
+        
+        Args:
+            span: Finished Span
+            
+        Returns:
+            bool: True if export was successful
+        """
+        return self.export(span.to_dict())
+    
     def export_batch(self, spans: List[Dict[str, Any]]) -> bool:
         """
-        Export multiple spans. Override for batch optimization.
+        Export multiple spans. Override to write or send them in one go.
         
         Args:
             spans: List of span data dictionaries
@@ -32,7 +233,9 @@ class BaseExporter(ABC):
         Returns:
             bool: True if all exports were successful
         """
-        return all(self.export(span) for span in spans)
+        # Export every span even after a failure
+        results = [self.export(span) for span in spans]
+        return all(results)
     
     def start(self) -> None:
         """Start the exporter."""
@@ -2,19 +2,30 @@
 AWS CloudWatch Logs exporter.
 """
 
-import atexit
-import json
+import collections
+import itertools
 import logging
 import os
 import threading
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import _SCHEDULER, BaseExporter, _json_dumps
 
 logger = logging.getLogger("genai_telemetry.exporters.cloudwatch")
 
+# (days since epoch, "YYYY-MM-DD") for the current UTC day
+_utc_day = (-1, "")
+
+
+def _utc_date() -> str:
+    """Return the current UTC date, reformatting only when the day changes."""
+    global _utc_day
+    day = int(time.time() // 86400)
+    if _utc_day[0] != day:
+        _utc_day = (day, time.strftime("%Y-%m-%d", time.gmtime(day * 86400)))
+    return _utc_day[1]
+
 
 class CloudWatchExporter(BaseExporter):
     """Sends logs to AWS CloudWatch Logs."""
@@ -27,130 +38,209 @@ class CloudWatchExporter(BaseExporter):
         access_key_id: str = None,
         secret_access_key: str = None,
         batch_size: int = 10,
-        flush_interval: float = 5.0
+        flush_interval: float = 5.0,
+        num_streams: int = 1,
+        max_queue_size: int = 10_000
     ):
         """
         Initialize CloudWatch exporter.
         
         Args:
             log_group: CloudWatch log group name
-            log_stream: CloudWatch log stream name (auto-generated if not provided)
+            log_stream: CloudWatch log stream name (auto-generated per UTC day if not provided)
             region: AWS region
             access_key_id: AWS access key (uses environment if not provided)
             secret_access_key: AWS secret key (uses environment if not provided)
             batch_size: Number of logs to batch before sending
             flush_interval: Seconds between automatic flushes
+            num_streams: Number of log streams to shard writes across so that
+                concurrent flushes don't serialize on one sequence token; with
+                more than one, stream names get a "-<n>" suffix
+            max_queue_size: Maximum number of buffered logs; the oldest are
+                dropped when the queue is full
         """
         self.log_group = log_group
-        self.log_stream = log_stream or f"genai-{datetime.now().strftime('%Y-%m-%d')}"
+        self._log_stream = log_stream
         self.region = region
         self.access_key_id = access_key_id or os.environ.get("AWS_ACCESS_KEY_ID")
         self.secret_access_key = secret_access_key or os.environ.get("AWS_SECRET_ACCESS_KEY")
         self.batch_size = batch_size
         self.flush_interval = flush_interval
         
-        self._batch: List[dict] = []
+        self.max_queue_size = max_queue_size
+        self._batch: Deque[dict] = collections.deque(maxlen=max_queue_size)
+        self._dropped = 0
+        self._dropped_at_check = 0
         self._lock = threading.Lock()
-        self._flush_thread: Optional[threading.Thread] = None
+        self._flush_handle: Optional[int] = None
         self._running = False
-        self._sequence_token = None
         
-        atexit.register(self.stop)
+        # Shard writes across several streams, each with its own sequence token
+        self.num_streams = max(1, num_streams)
+        self._stream_base: Optional[str] = None
+        self._log_streams: List[str] = []
+        self._sequence_tokens: List[Optional[str]] = [None] * self.num_streams
+        self._stream_locks = [threading.Lock() for _ in range(self.num_streams)]
+        self._shards = itertools.cycle(range(self.num_streams))
+        
+        # boto3 is resolved once, on start() or the first send
+        self._client = None
+        self._available: Optional[bool] = None
+        
+        _SCHEDULER.at_exit(self.stop)
+    
+    @property
+    def log_stream(self) -> str:
+        """Base log stream name. Auto-generated names roll over at UTC midnight."""
+        return self._log_stream or f"genai-{_utc_date()}"
+    
+    @log_stream.setter
+    def log_stream(self, value: Optional[str]) -> None:
+        self._log_stream = value
+    
+    @property
+    def log_streams(self) -> List[str]:
+        """Stream names for each shard, rebuilt when the base name changes."""
+        base = self.log_stream
+        if base != self._stream_base:
+            if self.num_streams == 1:
+                self._log_streams = [base]
+            else:
+                self._log_streams = [f"{base}-{i}" for i in range(self.num_streams)]
+            self._sequence_tokens = [None] * self.num_streams
+            self._stream_base = base
+        return self._log_streams
     
     def start(self) -> None:
-        """Start the exporter and background flush thread."""
+        """Start the exporter and schedule periodic flushes."""
         if self._running:
             return
         self._running = True
-        if self.batch_size > 1:
-            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-            self._flush_thread.start()
+        # Nothing can be sent without boto3, so don't schedule flushes
+        if self.batch_size > 1 and self._get_client() is not None:
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
     
     def stop(self) -> None:
         """Stop the exporter and flush remaining data."""
         self._running = False
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
         self.flush()
     
-    def _flush_loop(self) -> None:
-        """Background thread for periodic flushing."""
-        while self._running:
-            time.sleep(self.flush_interval)
-            self.flush()
-    
     def flush(self) -> None:
         """Flush any buffered logs."""
         with self._lock:
             if not self._batch:
                 return
-            batch = self._batch.copy()
-            self._batch = []
+            batch = list(self._batch)
+            self._batch.clear()
         self._send_batch(batch)
     
+    def _get_client(self):
+        """Return a cached CloudWatch Logs client, or None if boto3 is missing."""
+        if self._client is None and self._available is not False:
+            try:
+                import boto3
+            except ImportError:
+                logger.warning("boto3 not installed. Install with: pip install boto3")
+                self._available = False
+                return None
+            try:
+                self._client = boto3.client(
+                    "logs",
+                    region_name=self.region,
+                    aws_access_key_id=self.access_key_id,
+                    aws_secret_access_key=self.secret_access_key
+                )
+            except Exception as e:
+                logger.error(f"CloudWatch Error: {e}")
+                return None
+            self._available = True
+        return self._client
+    
     def _send_batch(self, batch: List[dict]) -> bool:
         """Send batch to CloudWatch (requires boto3)."""
         if not batch:
             return True
         
-        # Try using boto3 if available
         try:
-            import boto3
-            client = boto3.client(
-                "logs",
-                region_name=self.region,
-                aws_access_key_id=self.access_key_id,
-                aws_secret_access_key=self.secret_access_key
-            )
-            
-            log_events = []
-            for span in batch:
-                log_events.append({
-                    "timestamp": int(time.time() * 1000),
-                    "message": json.dumps(span)
-                })
+            client = self._get_client()
+            if client is None:
+                return False
             
-            kwargs = {
-                "logGroupName": self.log_group,
-                "logStreamName": self.log_stream,
-                "logEvents": log_events
-            }
+            timestamp = int(time.time() * 1000)
+            log_events = [{"timestamp": timestamp, "message": _json_dumps(span)} for span in batch]
             
-            if self._sequence_token:
-                kwargs["sequenceToken"] = self._sequence_token
-            
-            try:
-                response = client.put_log_events(**kwargs)
-                self._sequence_token = response.get("nextSequenceToken")
-                return True
-            except client.exceptions.ResourceNotFoundException:
-                # Create log group and stream
-                try:
-                    client.create_log_group(logGroupName=self.log_group)
-                except:
-                    pass
-                try:
-                    client.create_log_stream(logGroupName=self.log_group, logStreamName=self.log_stream)
-                except:
-                    pass
-                response = client.put_log_events(**kwargs)
-                self._sequence_token = response.get("nextSequenceToken")
-                return True
-                
-        except ImportError:
-            logger.warning("boto3 not installed. Install with: pip install boto3")
-            return False
+            shard = next(self._shards)
+            with self._stream_locks[shard]:
+                return self._put_log_events(client, shard, log_events)
         except Exception as e:
             logger.error(f"CloudWatch Error: {e}")
             return False
     
+    def _put_log_events(self, client, shard: int, log_events: List[dict]) -> bool:
+        """Write events to one stream shard. Caller must hold the shard's lock."""
+        log_stream = self.log_streams[shard]
+        kwargs = {
+            "logGroupName": self.log_group,
+            "logStreamName": log_stream,
+            "logEvents": log_events
+        }
+        
+        if self._sequence_tokens[shard]:
+            kwargs["sequenceToken"] = self._sequence_tokens[shard]
+        
+        try:
+            response = client.put_log_events(**kwargs)
+        except client.exceptions.ResourceNotFoundException:
+            # Create log group and stream
+            try:
+                client.create_log_group(logGroupName=self.log_group)
+            except:
+                pass
+            try:
+                client.create_log_stream(logGroupName=self.log_group, logStreamName=log_stream)
+            except:
+                pass
+            kwargs.pop("sequenceToken", None)
+            response = client.put_log_events(**kwargs)
+        except client.exceptions.InvalidSequenceTokenException as e:
+            # Retry with the token CloudWatch expects, or without one if the
+            # account no longer requires sequence tokens
+            expected = e.response.get("expectedSequenceToken")
+            if expected:
+                kwargs["sequenceToken"] = expected
+            else:
+                kwargs.pop("sequenceToken", None)
+            response = client.put_log_events(**kwargs)
+        
+        self._sequence_tokens[shard] = response.get("nextSequenceToken")
+        return True
+    
     def export(self, span_data: Dict[str, Any]) -> bool:
         """Export a single span as a log entry."""
         if self.batch_size <= 1:
             return self._send_batch([span_data])
         
         with self._lock:
+            if len(self._batch) == self.max_queue_size:
+                self._dropped += 1
             self._batch.append(span_data)
             should_flush = len(self._batch) >= self.batch_size
         
         if should_flush:
             self.flush()
         return True
+    
+    @property
+    def dropped(self) -> int:
+        """Number of logs dropped because the queue was full."""
+        return self._dropped
+    
+    def health_check(self) -> bool:
+        """Report unhealthy if logs were dropped since the last check."""
+        with self._lock:
+            healthy = self._dropped == self._dropped_at_check
+            self._dropped_at_check = self._dropped
+        return healthy
@@ -2,10 +2,79 @@
 Console exporter for debugging and development.
 """
 
-import json
+import sys
+from functools import lru_cache
 from typing import Any, Dict
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import BaseExporter, _json_dumps_indent
+
+# ANSI colors
+_COLORS = {
+    "LLM": "\033[94m",       # Blue
+    "EMBEDDING": "\033[95m",  # Magenta
+    "RETRIEVER": "\033[96m",  # Cyan
+    "TOOL": "\033[93m",       # Yellow
+    "CHAIN": "\033[92m",      # Green
+    "AGENT": "\033[91m",      # Red
+    "ERROR": "\033[91m",      # Red
+}
+_STATUS_COLORS = {
+    "OK": "\033[92m",     # Green
+    "ERROR": "\033[91m",  # Red
+}
+_RESET = "\033[0m"
+
+_TEMPLATE = (
+    "[{span_type:12}] {name:30} | {duration_ms:>8.1f}ms | {status:5} | {model_name} | "
+    "in:{input_tokens} out:{output_tokens} total:{total_tokens}\n"
+)
+
+
+@lru_cache(maxsize=64)
+def _color_template(span_type: str, status: str) -> str:
+    """Return the colored line template for a span type and status."""
+    color = _COLORS.get(span_type, _RESET)
+    status_color = _STATUS_COLORS["ERROR" if status == "ERROR" else "OK"]
+    return (
+        color + "[{span_type:12}]" + _RESET + " {name:30} | {duration_ms:>8.1f}ms | "
+        + status_color + "{status:5}" + _RESET + " | {model_name} | "
+        "in:{input_tokens} out:{output_tokens} total:{total_tokens}\n"
+    )
+
+
+_DEFAULTS = {
+    "span_type": "UNKNOWN",
+    "name": "unknown",
+    "duration_ms": 0,
+    "status": "OK",
+    "model_name": "",
+    "input_tokens": 0,
+    "output_tokens": 0,
+}
+
+
+def _write_stdout(text: str) -> None:
+    """Write text to stdout as a single encoded chunk on the binary buffer."""
+    stdout = sys.stdout
+    buffer = getattr(stdout, "buffer", None)
+    if buffer is None:
+        # Replaced streams (StringIO and the like) have no binary layer
+        stdout.write(text)
+        return
+    # Push out anything already written through the text layer so output
+    # stays in order
+    stdout.flush()
+    buffer.write(text.encode(stdout.encoding or "utf-8", getattr(stdout, "errors", None) or "strict"))
+    buffer.flush()
+
+
+class _SpanFields(dict):
+    """Span data view that fills in defaults and derived fields for formatting."""
+    
+    def __missing__(self, key: str) -> Any:
+        if key == "total_tokens":
+            return self["input_tokens"] + self["output_tokens"]
+        return _DEFAULTS[key]
 
 
 class ConsoleExporter(BaseExporter):
@@ -22,37 +91,40 @@ class ConsoleExporter(BaseExporter):
         self.colored = colored
         self.verbose = verbose
     
-    def export(self, span_data: Dict[str, Any]) -> bool:
-        """Print span to console."""
-        span_type = span_data.get('span_type', 'UNKNOWN')
-        name = span_data.get('name', 'unknown')
-        duration = span_data.get('duration_ms', 0)
-        status = span_data.get('status', 'OK')
-        model = span_data.get('model_name', '')
-        input_tokens = span_data.get('input_tokens', 0)
-        output_tokens = span_data.get('output_tokens', 0)
-        total_tokens = input_tokens + output_tokens
-        
+    def _line(self, fields: Dict[str, Any]) -> str:
+        """Format the one-line summary of a span."""
         if self.colored:
-            # ANSI colors
-            colors = {
-                "LLM": "\033[94m",       # Blue
-                "EMBEDDING": "\033[95m",  # Magenta
-                "RETRIEVER": "\033[96m",  # Cyan
-                "TOOL": "\033[93m",       # Yellow
-                "CHAIN": "\033[92m",      # Green
-                "AGENT": "\033[91m",      # Red
-                "ERROR": "\033[91m",      # Red
-            }
-            reset = "\033[0m"
-            color = colors.get(span_type, "\033[0m")
-            status_color = "\033[91m" if status == "ERROR" else "\033[92m"
-            
-            print(f"{color}[{span_type:12}]{reset} {name:30} | {duration:>8.1f}ms | {status_color}{status:5}{reset} | {model} | in:{input_tokens} out:{output_tokens} total:{total_tokens}")
+            template = _color_template(fields["span_type"], fields["status"])
         else:
-            print(f"[{span_type:12}] {name:30} | {duration:>8.1f}ms | {status:5} | {model} | in:{input_tokens} out:{output_tokens} total:{total_tokens}")
+            template = _TEMPLATE
+        return template.format_map(fields)
+    
+    def export(self, span_data: Dict[str, Any]) -> bool:
+        """Print span to console."""
+        text = self._line(_SpanFields(span_data))
         
         if self.verbose:
-            print(f"    {json.dumps(span_data, indent=2)}")
+            text += f"    {_json_dumps_indent(span_data)}\n"
+        
+        _write_stdout(text)
+        return True
+    
+    def export_span(self, span: Any) -> bool:
+        """Print a finished Span, reading its slots instead of building to_dict()."""
+        if self.verbose or span.attributes:
+            # Verbose output needs the full dict; attributes may override fields
+            return self.export(span.to_dict())
         
+        input_tokens = span.input_tokens or 0
+        output_tokens = span.output_tokens or 0
+        _write_stdout(self._line({
+            "span_type": span.span_type,
+            "name": span.name,
+            "duration_ms": span.duration_ms or 0,
+            "status": span.status,
+            "model_name": span.model_name or "",
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }))
         return True
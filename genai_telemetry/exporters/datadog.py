@@ -2,16 +2,19 @@
 Datadog exporter for direct API integration.
 """
 
-import atexit
-import json
+import collections
 import logging
 import threading
-import time
-import uuid
-import urllib.request
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import (
+    _SCHEDULER,
+    BaseExporter,
+    _json_dumpb,
+    _json_dumps,
+    _split_by_size,
+)
+from genai_telemetry.exporters.http import HTTPConnectionPool, gzip_body
 
 logger = logging.getLogger("genai_telemetry.exporters.datadog")
 
@@ -26,96 +29,157 @@ class DatadogExporter(BaseExporter):
         service_name: str = "genai-app",
         env: str = "production",
         batch_size: int = 10,
-        flush_interval: float = 5.0
+        flush_interval: float = 5.0,
+        compress: bool = True,
+        max_batch_size: int = 1000,
+        max_batch_bytes: int = 5_000_000,
+        max_queue_size: int = 10_000
     ):
         self.api_key = api_key
         self.site = site
         self.service_name = service_name
         self.env = env
         self.endpoint = f"https://http-intake.logs.{site}/api/v2/logs"
+        self._tags_prefix = f"env:{env},service:{service_name}"
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.compress = compress
+        # Datadog accepts at most 1000 logs and 5MB per request
+        self.max_batch_size = max(batch_size, max_batch_size)
+        self.max_batch_bytes = max_batch_bytes
         
-        self._batch: List[dict] = []
-        self._lock = threading.Lock()
-        self._flush_thread: Optional[threading.Thread] = None
+        # deque append/popleft are atomic, so producers never take a lock.
+        # The bound keeps memory flat if the backend stalls; the oldest spans
+        # are evicted first.
+        self.max_queue_size = max(max_queue_size, self.max_batch_size)
+        self._batch: Deque[dict] = collections.deque(maxlen=self.max_queue_size)
+        self._dropped = 0
+        self._dropped_logged = 0
+        self._dropped_at_check = 0
+        self._flush_handle: Optional[int] = None
         self._running = False
+        self._http = HTTPConnectionPool()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
         
-        atexit.register(self.stop)
+        _SCHEDULER.at_exit(self.stop)
     
     def start(self) -> None:
-        """Start the exporter and background flush thread."""
+        """Start the exporter and schedule periodic flushes."""
         if self._running:
             return
         self._running = True
         if self.batch_size > 1:
-            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-            self._flush_thread.start()
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
     
     def stop(self) -> None:
         """Stop the exporter and flush remaining data."""
         self._running = False
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
         self.flush()
+        self._http.close()
     
-    def _flush_loop(self) -> None:
-        """Background thread for periodic flushing."""
-        while self._running:
-            time.sleep(self.flush_interval)
-            self.flush()
+    def _batch_target(self) -> int:
+        """Batch size that triggers a flush; grows while sends are in flight."""
+        return min(self.max_batch_size, self.batch_size * (1 + self._in_flight))
     
     def flush(self) -> None:
         """Flush any buffered spans."""
-        with self._lock:
-            if not self._batch:
-                return
-            batch = self._batch.copy()
-            self._batch = []
-        self._send_batch(batch)
+        batch = []
+        popleft = self._batch.popleft
+        for _ in range(len(self._batch)):
+            try:
+                batch.append(popleft())
+            except IndexError:
+                break
+        if batch:
+            self._send_batch(batch)
+        
+        dropped = self._dropped
+        if dropped != self._dropped_logged:
+            logger.warning(f"Dropped {dropped - self._dropped_logged} spans because the queue was full")
+            self._dropped_logged = dropped
     
     def _send_batch(self, batch: List[dict]) -> bool:
         """Send a batch of spans to Datadog Logs API."""
         if not batch:
             return True
         
-        dd_logs = []
-        for span in batch:
-            dd_logs.append({
+        # Bind loop invariants to locals once per batch
+        tags_prefix = self._tags_prefix
+        service = self.service_name
+        dumps = _json_dumps
+        # Each entry is encoded once and measured as sent: the message is
+        # escaped again inside the envelope, so its raw length undercounts
+        entries = [
+            _json_dumpb({
                 "ddsource": "genai-telemetry",
-                "ddtags": f"env:{self.env},service:{self.service_name},span_type:{span.get('span_type', 'unknown')},model:{span.get('model_name', 'unknown')}",
+                "ddtags": f"{tags_prefix},span_type:{span.get('span_type', 'unknown')},model:{span.get('model_name', 'unknown')}",
                 "hostname": span.get("workflow_name", "genai-app"),
-                "service": self.service_name,
-                "message": json.dumps(span)
+                "service": service,
+                "message": dumps(span)
             })
+            for span in batch
+        ]
+        # One byte per entry for the separating comma, two for the brackets
+        sizes = [len(entry) + 1 for entry in entries]
+        max_bytes = self.max_batch_bytes - 2
         
-        payload = json.dumps(dd_logs)
-        data = payload.encode("utf-8")
+        ok = True
+        for chunk in _split_by_size(entries, sizes, self.max_batch_size, max_bytes):
+            ok = self._post(chunk) and ok
+        return ok
+    
+    def _post(self, entries: List[bytes]) -> bool:
+        """POST one request's worth of encoded log entries to Datadog."""
+        data = b"[" + b",".join(entries) + b"]"
         
-        req = urllib.request.Request(
-            self.endpoint,
-            data=data,
-            headers={
-                "Content-Type": "application/json",
-                "DD-API-KEY": self.api_key,
-            },
-            method="POST"
-        )
+        headers = {
+            "Content-Type": "application/json",
+            "DD-API-KEY": self.api_key,
+        }
+        if self.compress:
+            data, headers = gzip_body(data, headers)
         
+        with self._in_flight_lock:
+            self._in_flight += 1
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                return resp.status in [200, 202]
+            status = self._http.request("POST", self.endpoint, body=data, headers=headers)
+            return status in [200, 202]
         except Exception as e:
             logger.error(f"Datadog Error: {e}")
             return False
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
     
     def export(self, span_data: Dict[str, Any]) -> bool:
         """Export a single span."""
         if self.batch_size <= 1:
             return self._send_batch([span_data])
         
-        with self._lock:
-            self._batch.append(span_data)
-            should_flush = len(self._batch) >= self.batch_size
-        
-        if should_flush:
-            self.flush()
+        if len(self._batch) == self.max_queue_size:
+            self._dropped += 1
+        self._batch.append(span_data)
+        if len(self._batch) >= self._batch_target():
+            # Hand the send to the flush thread when running, so the caller
+            # doesn't block on HTTP
+            if self._flush_handle is not None:
+                _SCHEDULER.trigger(self._flush_handle)
+            else:
+                self.flush()
         return True
+    
+    @property
+    def dropped(self) -> int:
+        """Number of spans dropped because the queue was full."""
+        return self._dropped
+    
+    def health_check(self) -> bool:
+        """Report unhealthy if spans were dropped since the last check."""
+        dropped = self._dropped
+        healthy = dropped == self._dropped_at_check
+        self._dropped_at_check = dropped
+        return healthy
@@ -2,21 +2,59 @@
 Elasticsearch exporter.
 """
 
-import atexit
 import base64
-import json
+import collections
 import logging
-import ssl
 import threading
 import time
-import urllib.request
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Union
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import _SCHEDULER, BaseExporter, _json_dumpb
+from genai_telemetry.exporters.http import (
+    STREAM_CHUNK_SIZE,
+    GzipStream,
+    HTTPConnectionPool,
+    HTTPStatusError,
+    default_ssl_context,
+    gzip_body,
+)
 
 logger = logging.getLogger("genai_telemetry.exporters.elasticsearch")
 
+# A failing host is skipped for 1s, doubling per consecutive failure up to 64s
+_HOST_BACKOFF = 1.0
+_HOST_BACKOFF_MAX_DOUBLINGS = 6
+
+
+class _BulkStream:
+    """
+    Bulk API body, encoded lazily in chunks of about chunk_size bytes.
+    
+    Iterating again re-encodes from the start, so the pool can retry the request.
+    """
+    
+    __slots__ = ("action", "batch", "chunk_size")
+    
+    def __init__(self, action: bytes, batch: List[dict], chunk_size: int = STREAM_CHUNK_SIZE):
+        self.action = action
+        self.batch = batch
+        self.chunk_size = chunk_size
+    
+    def __iter__(self) -> Iterator[bytes]:
+        action = self.action
+        chunk_size = self.chunk_size
+        buf = bytearray()
+        for span in self.batch:
+            buf += action
+            buf += _json_dumpb(span)
+            buf += b"\n"
+            if len(buf) >= chunk_size:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
+
 
 class ElasticsearchExporter(BaseExporter):
     """Sends spans to Elasticsearch."""
@@ -30,7 +68,10 @@ class ElasticsearchExporter(BaseExporter):
         password: str = None,
         verify_ssl: bool = True,
         batch_size: int = 1,
-        flush_interval: float = 5.0
+        flush_interval: float = 5.0,
+        compress: bool = True,
+        max_queue_size: int = 10_000,
+        stream: bool = False
     ):
         """
         Initialize Elasticsearch exporter.
@@ -44,6 +85,11 @@ class ElasticsearchExporter(BaseExporter):
             verify_ssl: Whether to verify SSL certificates
             batch_size: Number of events to batch before sending
             flush_interval: Seconds between automatic flushes
+            compress: Whether to gzip request bodies
+            max_queue_size: Maximum number of buffered spans; the oldest are
+                dropped when the queue is full
+            stream: Send bulk bodies as chunked requests encoded while they
+                are sent, instead of building each body in memory
         """
         self.hosts = hosts or ["http://localhost:9200"]
         self.index = index
@@ -52,127 +98,222 @@ class ElasticsearchExporter(BaseExporter):
         self.password = password
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.compress = compress
+        self.stream = stream
         
-        self.ssl_context = ssl.create_default_context()
-        if not verify_ssl:
-            self.ssl_context.check_hostname = False
-            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.ssl_context = default_ssl_context(verify_ssl)
         
-        self._batch: List[dict] = []
-        self._lock = threading.Lock()
-        self._flush_thread: Optional[threading.Thread] = None
+        # deque append/popleft are atomic, so producers never take a lock.
+        # The bound keeps memory flat if the backend stalls; the oldest spans
+        # are evicted first.
+        self.max_queue_size = max(max_queue_size, batch_size)
+        self._batch: Deque[dict] = collections.deque(maxlen=self.max_queue_size)
+        self._dropped = 0
+        self._dropped_logged = 0
+        self._dropped_at_check = 0
+        self._flush_handle: Optional[int] = None
         self._running = False
-        self._host_index = 0
+        # Requests stick to one host, keeping its connections warm, until it
+        # fails; a failing host is then skipped while in backoff
+        self._hosts = [host.rstrip("/") for host in self.hosts]
+        self._host = self._hosts[0]
+        self._host_failures = dict.fromkeys(self._hosts, 0)
+        self._host_retry_at = dict.fromkeys(self._hosts, 0.0)
+        self._host_lock = threading.Lock()
+        self._bulk_action = b""
+        self._bulk_action_expires = 0.0
+        self._http = HTTPConnectionPool(ssl_context=self.ssl_context)
+        
+        # Headers never change, so build them once per content type
+        auth = {}
+        if api_key:
+            auth["Authorization"] = f"ApiKey {api_key}"
+        elif username and password:
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            auth["Authorization"] = f"Basic {credentials}"
+        self._headers = {
+            content_type: {"Content-Type": content_type, **auth}
+            for content_type in ("application/json", "application/x-ndjson")
+        }
+        self._gzip_headers = {
+            content_type: {**headers, "Content-Encoding": "gzip"}
+            for content_type, headers in self._headers.items()
+        }
         
-        atexit.register(self.stop)
+        _SCHEDULER.at_exit(self.stop)
     
     def _get_host(self) -> str:
-        """Round-robin host selection."""
-        host = self.hosts[self._host_index % len(self.hosts)]
-        self._host_index += 1
-        return host.rstrip("/")
-    
-    def _get_headers(self) -> dict:
-        """Build authentication headers."""
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["Authorization"] = f"ApiKey {self.api_key}"
-        elif self.username and self.password:
-            credentials = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        return headers
+        """Current host; sticky until it fails, then the healthiest host."""
+        host = self._host
+        if self._host_retry_at[host] <= time.monotonic():
+            return host
+        with self._host_lock:
+            now = time.monotonic()
+            failures = self._host_failures
+            retry_at = self._host_retry_at
+            # Hosts out of backoff first, then fewest failures, then the one
+            # whose backoff ends soonest
+            self._host = min(self._hosts, key=lambda h: (retry_at[h] > now, failures[h], retry_at[h]))
+            return self._host
+    
+    def _host_failed(self, host: str) -> None:
+        """Put a host in backoff after a connection error or 5xx response."""
+        with self._host_lock:
+            failures = self._host_failures[host] + 1
+            self._host_failures[host] = failures
+            backoff = _HOST_BACKOFF * 2 ** min(failures - 1, _HOST_BACKOFF_MAX_DOUBLINGS)
+            self._host_retry_at[host] = time.monotonic() + backoff
+    
+    def _host_succeeded(self, host: str) -> None:
+        """Clear a host's failure count after it responds."""
+        if self._host_failures[host]:
+            with self._host_lock:
+                self._host_failures[host] = 0
+                self._host_retry_at[host] = 0.0
+    
+    def _get_headers(self, content_type: str = "application/json") -> dict:
+        """Return the shared request headers for a content type."""
+        return self._headers[content_type]
     
     def start(self) -> None:
-        """Start the exporter and background flush thread."""
+        """Start the exporter and schedule periodic flushes."""
         if self._running:
             return
         self._running = True
         if self.batch_size > 1:
-            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-            self._flush_thread.start()
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
     
     def stop(self) -> None:
         """Stop the exporter and flush remaining data."""
         self._running = False
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
         self.flush()
-    
-    def _flush_loop(self) -> None:
-        """Background thread for periodic flushing."""
-        while self._running:
-            time.sleep(self.flush_interval)
-            self.flush()
+        self._http.close()
     
     def flush(self) -> None:
         """Flush any buffered spans."""
-        with self._lock:
-            if not self._batch:
-                return
-            batch = self._batch.copy()
-            self._batch = []
-        self._send_batch(batch)
+        batch = []
+        popleft = self._batch.popleft
+        for _ in range(len(self._batch)):
+            try:
+                batch.append(popleft())
+            except IndexError:
+                break
+        if batch:
+            self._send_batch(batch)
+        
+        dropped = self._dropped
+        if dropped != self._dropped_logged:
+            logger.warning(f"Dropped {dropped - self._dropped_logged} spans because the queue was full")
+            self._dropped_logged = dropped
     
     def _send_batch(self, batch: List[dict]) -> bool:
         """Send a batch using Elasticsearch bulk API."""
         if not batch:
             return True
         
-        # Build bulk request
-        lines = []
+        action = self._get_bulk_action()
+        if self.stream and len(batch) > 1:
+            return self._send(_BulkStream(action, batch), "/_bulk", "application/x-ndjson")
+        
+        # Build bulk request directly into one buffer
+        payload = bytearray()
         for span in batch:
-            # Index action
-            index_date = datetime.now().strftime("%Y.%m.%d")
-            index_name = f"{self.index}-{index_date}"
-            action = {"index": {"_index": index_name}}
-            lines.append(json.dumps(action))
-            lines.append(json.dumps(span))
+            payload += action
+            payload += _json_dumpb(span)
+            payload += b"\n"
         
-        payload = "\n".join(lines) + "\n"
-        return self._send(payload, "/_bulk")
+        return self._send(payload, "/_bulk", "application/x-ndjson")
+    
+    def _get_bulk_action(self) -> bytes:
+        """Bulk index action line for today's index, re-checked every minute."""
+        now = time.time()
+        if now >= self._bulk_action_expires:
+            index_name = f"{self.index}-{datetime.now().strftime('%Y.%m.%d')}"
+            self._bulk_action = _json_dumpb({"index": {"_index": index_name}}) + b"\n"
+            self._bulk_action_expires = now + 60
+        return self._bulk_action
     
-    def _send(self, payload: str, endpoint: str = "") -> bool:
+    def _send(
+        self,
+        payload: Union[bytes, bytearray, Iterable[bytes]],
+        endpoint: str = "",
+        content_type: str = "application/json"
+    ) -> bool:
         """Send payload to Elasticsearch."""
         host = self._get_host()
         url = f"{host}{endpoint}"
-        data = payload.encode("utf-8")
-        
-        req = urllib.request.Request(
-            url,
-            data=data,
-            headers=self._get_headers(),
-            method="POST"
-        )
+        data = payload
+        headers = self._get_headers(content_type)
+        if self.compress:
+            if isinstance(data, (bytes, bytearray)):
+                data, headers = gzip_body(data, headers, gzip_headers=self._gzip_headers[content_type])
+            else:
+                data, headers = GzipStream(data), self._gzip_headers[content_type]
         
         try:
-            ctx = self.ssl_context if url.startswith("https") else None
-            with urllib.request.urlopen(req, context=ctx, timeout=10) as resp:
-                return resp.status in (200, 201)
+            status = self._http.request("POST", url, body=data, headers=headers)
+        except HTTPStatusError as e:
+            # 4xx means a bad request, not a bad host
+            if e.status >= 500:
+                self._host_failed(host)
+            logger.error(f"Elasticsearch Error: {e}")
+            return False
         except Exception as e:
+            self._host_failed(host)
             logger.error(f"Elasticsearch Error: {e}")
             return False
+        self._host_succeeded(host)
+        return status in (200, 201)
     
     def export(self, span_data: Dict[str, Any]) -> bool:
         """Export a single span."""
-        # Add @timestamp for Elasticsearch
-        if "@timestamp" not in span_data:
-            span_data["@timestamp"] = span_data.get("timestamp", datetime.now(timezone.utc).isoformat())
+        return self.export_batch([span_data])
+    
+    def export_batch(self, spans: List[Dict[str, Any]]) -> bool:
+        """Export spans, sending them in one bulk request when not batching."""
+        # Add @timestamp for Elasticsearch without mutating the caller's dicts,
+        # which other exporters may be serializing concurrently
+        spans = [
+            span_data if "@timestamp" in span_data else {
+                **span_data,
+                "@timestamp": span_data.get("timestamp", datetime.now(timezone.utc).isoformat()),
+            }
+            for span_data in spans
+        ]
         
         if self.batch_size <= 1:
-            return self._send_batch([span_data])
-        
-        with self._lock:
-            self._batch.append(span_data)
-            should_flush = len(self._batch) >= self.batch_size
+            return self._send_batch(spans) if spans else True
         
-        if should_flush:
-            self.flush()
+        overflow = len(self._batch) + len(spans) - self.max_queue_size
+        if overflow > 0:
+            self._dropped += overflow
+        self._batch.extend(spans)
+        if len(self._batch) >= self.batch_size:
+            # Hand the send to the flush thread when running, so the caller
+            # doesn't block on HTTP
+            if self._flush_handle is not None:
+                _SCHEDULER.trigger(self._flush_handle)
+            else:
+                self.flush()
         return True
     
+    @property
+    def dropped(self) -> int:
+        """Number of spans dropped because the queue was full."""
+        return self._dropped
+    
     def health_check(self) -> bool:
-        """Check if Elasticsearch is reachable."""
+        """Check if Elasticsearch is reachable and no spans were dropped since the last check."""
+        dropped = self._dropped
+        if dropped != self._dropped_at_check:
+            self._dropped_at_check = dropped
+            return False
         try:
             host = self._get_host()
-            req = urllib.request.Request(f"{host}/_cluster/health", headers=self._get_headers())
-            with urllib.request.urlopen(req, timeout=5) as resp:
-                return resp.status == 200
-        except:
+            status = self._http.request("GET", f"{host}/_cluster/health", headers=self._get_headers())
+            return status == 200
+        except Exception:
             return False
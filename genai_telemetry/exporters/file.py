@@ -2,46 +2,205 @@
 File exporter for writing spans to JSONL files.
 """
 
-import json
 import logging
 import os
+import queue
 import threading
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, List, Optional
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import _SCHEDULER, BaseExporter, _json_dumpb
 
 logger = logging.getLogger("genai_telemetry.exporters.file")
 
+# Tells the writer thread to exit
+_STOP = object()
+
 
 class FileExporter(BaseExporter):
     """Writes spans to a JSONL file."""
     
-    def __init__(self, file_path: str, rotate_size_mb: int = 100):
+    def __init__(
+        self,
+        file_path: str,
+        rotate_size_mb: int = 100,
+        buffer_size: int = 65536,
+        flush_interval: float = 1.0,
+        async_write: bool = False,
+        sink: Optional[BinaryIO] = None
+    ):
         """
         Initialize file exporter.
         
         Args:
             file_path: Path to the output file
             rotate_size_mb: Rotate file when it exceeds this size in MB
+            buffer_size: Write buffer size in bytes
+            flush_interval: Seconds between flushes of the write buffer to disk
+            async_write: Serialize and write spans on a background thread so
+                export() only enqueues them
+            sink: Binary stream to write to instead of opening file_path,
+                e.g. io.BytesIO; it is never rotated or closed
         """
         self.file_path = file_path
         self.rotate_size_mb = rotate_size_mb
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.async_write = async_write
+        self._sink = sink
+        self._rotate_bytes = rotate_size_mb * 1024 * 1024
         self._lock = threading.Lock()
+        
+        # The file stays open between spans; its size is tracked in memory
+        # so rotation needs no stat call per write
+        self._fh: Optional[BinaryIO] = None
+        self._bytes_written = 0
+        self._flush_handle: Optional[int] = None
+        
+        self._queue: Optional["queue.SimpleQueue[Any]"] = None
+        self._writer: Optional[threading.Thread] = None
+        
+        _SCHEDULER.at_exit(self.stop)
+    
+    def start(self) -> None:
+        """Schedule periodic flushes of the write buffer and start the writer thread."""
+        if self._flush_handle is None:
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
+        if self.async_write:
+            self._start_writer()
+    
+    def stop(self) -> None:
+        """Flush buffered spans and close the file."""
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
+        writer, q = self._writer, self._queue
+        if writer is not None:
+            self._writer = self._queue = None
+            q.put(_STOP)
+            writer.join(timeout=5.0)
+        with self._lock:
+            self._close()
+    
+    def flush(self) -> None:
+        """Write buffered spans to disk."""
+        q = self._queue
+        if q is not None:
+            # Wait for the writer to reach everything queued before this call
+            done = threading.Event()
+            q.put(done)
+            done.wait(timeout=5.0)
+        with self._lock:
+            if self._fh is not None:
+                try:
+                    self._fh.flush()
+                except Exception as e:
+                    logger.error(f"File write error: {e}")
+    
+    def _open(self) -> BinaryIO:
+        """Open the output file for appending. Caller must hold the lock."""
+        if self._sink is not None:
+            self._fh = self._sink
+            self._bytes_written = 0
+            return self._fh
+        self._fh = open(self.file_path, "ab", buffering=self.buffer_size)
+        self._bytes_written = self._fh.tell()
+        return self._fh
+    
+    def _close(self) -> None:
+        """Flush and close the output file. Caller must hold the lock."""
+        if self._fh is not None:
+            fh, self._fh = self._fh, None
+            if fh is self._sink:
+                # The caller owns the sink
+                fh.flush()
+            else:
+                fh.close()
+    
+    def _rotate(self) -> None:
+        """Move the current file aside and start a new one. Caller must hold the lock."""
+        self._close()
+        rotated = f"{self.file_path}.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        os.rename(self.file_path, rotated)
+    
+    def _write(self, line: bytes) -> None:
+        """Append one line, rotating first if needed. Caller must hold the lock."""
+        fh = self._fh or self._open()
+        # Rotate before writing so an existing oversized file is moved aside
+        if self._bytes_written >= self._rotate_bytes and self._sink is None:
+            self._rotate()
+            fh = self._open()
+        fh.write(line)
+        self._bytes_written += len(line)
+    
+    def _start_writer(self) -> "queue.SimpleQueue[Any]":
+        """Start the background writer thread if it is not running."""
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.SimpleQueue()
+                self._writer = threading.Thread(
+                    target=self._writer_loop,
+                    args=(self._queue,),
+                    name="genai-telemetry-file-writer",
+                    daemon=True,
+                )
+                self._writer.start()
+            return self._queue
+    
+    def _writer_loop(self, q: "queue.SimpleQueue[Any]") -> None:
+        """Drain queued spans into the file until told to stop."""
+        while True:
+            # Take everything already queued so one lock acquisition covers
+            # a burst of spans
+            items = [q.get()]
+            while True:
+                try:
+                    items.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            with self._lock:
+                for item in items:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        item.set()
+                    else:
+                        try:
+                            self._write(_json_dumpb(item) + b"\n")
+                        except Exception as e:
+                            logger.error(f"File write error: {e}")
+            if stop:
+                return
     
     def export(self, span_data: Dict[str, Any]) -> bool:
         """Write span to file as JSON line."""
+        if self.async_write:
+            (self._queue or self._start_writer()).put(span_data)
+            return True
+        try:
+            line = _json_dumpb(span_data) + b"\n"
+            with self._lock:
+                self._write(line)
+            return True
+        except Exception as e:
+            logger.error(f"File write error: {e}")
+            return False
+    
+    def export_batch(self, spans: List[Dict[str, Any]]) -> bool:
+        """Write spans to file as JSON lines in a single write."""
+        if self.async_write:
+            q = self._queue or self._start_writer()
+            for span_data in spans:
+                q.put(span_data)
+            return True
+        if not spans:
+            return True
         try:
+            data = b"\n".join([_json_dumpb(span_data) for span_data in spans]) + b"\n"
             with self._lock:
-                # Check for rotation
-                if os.path.exists(self.file_path):
-                    size_mb = os.path.getsize(self.file_path) / (1024 * 1024)
-                    if size_mb >= self.rotate_size_mb:
-                        rotated = f"{self.file_path}.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                        os.rename(self.file_path, rotated)
-                
-                with open(self.file_path, "a") as f:
-                    f.write(json.dumps(span_data) + "\n")
+                self._write(data)
             return True
         except Exception as e:
             logger.error(f"File write error: {e}")
@@ -0,0 +1,306 @@
+"""
+Keep-alive HTTP connection pool shared by the HTTP-based exporters.
+"""
+
+import base64
+import functools
+import gzip
+import http.client
+import socket
+import ssl
+import threading
+import time
+import urllib.request
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+
+# Bodies smaller than this are sent uncompressed; gzip overhead outweighs the gain
+GZIP_MIN_SIZE = 512
+
+# Streamed bodies are sent in chunks of about this many bytes
+STREAM_CHUNK_SIZE = 65536
+
+
+def gzip_body(
+    data: bytes,
+    headers: Dict[str, str],
+    min_size: int = GZIP_MIN_SIZE,
+    gzip_headers: Optional[Dict[str, str]] = None
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Gzip a request body if it is large enough.
+    
+    Args:
+        data: Request body
+        headers: Request headers (not modified)
+        min_size: Minimum body size in bytes worth compressing
+        gzip_headers: Prebuilt headers with Content-Encoding set, returned
+            instead of a fresh copy when compressed
+    
+    Returns:
+        tuple: (body, headers) with Content-Encoding set when compressed
+    """
+    if len(data) < min_size:
+        return data, headers
+    return gzip.compress(data, compresslevel=1), gzip_headers or {**headers, "Content-Encoding": "gzip"}
+
+
+class GzipStream:
+    """
+    Gzip-compresses a chunked request body while it is sent.
+    
+    Iterating again compresses from the start, so the pool can retry the request.
+    """
+    
+    __slots__ = ("chunks",)
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = chunks
+    
+    def __iter__(self) -> Iterator[bytes]:
+        # wbits=31 writes the gzip header and trailer
+        compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+        for chunk in self.chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context(verify: bool) -> ssl.SSLContext:
+    context = ssl.create_default_context()
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def default_ssl_context(verify: bool = True) -> ssl.SSLContext:
+    """
+    Shared SSL context, so the CA bundle is loaded once per process.
+    
+    The context is shared by every exporter; don't modify it. Pass your own
+    context to HTTPConnectionPool for client certificates or custom CAs.
+    
+    Args:
+        verify: Whether to verify server certificates and host names
+    """
+    # Normalized so default and explicit arguments hit the same cache entry
+    return _ssl_context(bool(verify))
+
+
+class HTTPStatusError(Exception):
+    """Raised when the server responds with an error status (4xx/5xx)."""
+    
+    def __init__(self, url: str, status: int, reason: str):
+        super().__init__(f"HTTP Error {status}: {reason} ({url})")
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+
+class HTTPConnectionPool:
+    """
+    Thread-safe pool of persistent HTTP/1.1 connections.
+    
+    Connections are kept per (scheme, host, port) and reused across requests,
+    so batches after the first skip the TCP and TLS handshakes. Proxies from
+    the HTTP_PROXY/HTTPS_PROXY/NO_PROXY environment are honoured like urlopen().
+    """
+    
+    def __init__(
+        self,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        maxsize: int = 4,
+        timeout: float = 10,
+        dns_ttl: float = 60.0
+    ):
+        """
+        Initialize connection pool.
+        
+        Args:
+            ssl_context: SSL context for HTTPS connections (shared verifying
+                context if None)
+            maxsize: Maximum number of idle connections kept per host
+            timeout: Socket timeout in seconds
+            dns_ttl: Seconds to reuse a resolved host address (0 disables caching)
+        """
+        self.ssl_context = ssl_context or default_ssl_context()
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.dns_ttl = dns_ttl
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._dns: Dict[Tuple[str, int], Tuple[float, List[tuple]]] = {}
+        self._proxies = urllib.request.getproxies()
+        self._routes: Dict[Tuple[str, str], Optional[Tuple[str, Dict[str, str]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _proxy_for(self, scheme: str, netloc: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Look up the proxy for a host, cached per (scheme, netloc).
+        
+        Returns:
+            tuple: (proxy netloc, proxy auth headers), or None to connect directly
+        """
+        key = (scheme, netloc)
+        if key in self._routes:
+            return self._routes[key]
+        route = None
+        proxy = self._proxies.get(scheme)
+        if proxy and not urllib.request.proxy_bypass(urlsplit(f"//{netloc}").hostname or netloc):
+            if "://" not in proxy:
+                proxy = f"http://{proxy}"
+            parts = urlsplit(proxy)
+            auth = {}
+            if parts.username is not None:
+                credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+                auth["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode("ascii")
+            route = (parts.netloc.rpartition("@")[2], auth)
+        self._routes[key] = route
+        return route
+    
+    def _new_connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        """Open a new connection to the given host, through a proxy if configured."""
+        route = self._proxy_for(scheme, netloc)
+        address = route[0] if route else netloc
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                address, timeout=self.timeout, context=self.ssl_context
+            )
+            if route:
+                # CONNECT through the proxy; TLS is still negotiated with the target
+                target = urlsplit(f"//{netloc}")
+                conn.set_tunnel(target.hostname, target.port, headers=route[1] or None)
+        else:
+            conn = http.client.HTTPConnection(address, timeout=self.timeout)
+        if self.dns_ttl > 0:
+            # Connect to the cached address; the connection keeps the original
+            # host name for the Host header and TLS SNI/certificate checks
+            conn._create_connection = self._create_connection
+        return conn
+    
+    def _resolve(self, host: str, port: int) -> List[tuple]:
+        """Resolve a host to socket addresses, cached for dns_ttl seconds."""
+        key = (host, port)
+        now = time.monotonic()
+        cached = self._dns.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        addrs = [info[4] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+        self._dns[key] = (now + self.dns_ttl, addrs)
+        return addrs
+    
+    def _create_connection(self, address, timeout=None, source_address=None) -> socket.socket:
+        """socket.create_connection() using cached DNS results."""
+        host, port = address
+        error = None
+        for addr in self._resolve(host, port):
+            try:
+                return socket.create_connection(addr[:2], timeout, source_address)
+            except OSError as e:
+                error = e
+        # None of the cached addresses worked; resolve again next time
+        self._dns.pop((host, port), None)
+        raise error or OSError(f"Could not resolve {host}")
+    
+    def _checkout(self, key: Tuple[str, str]) -> Optional[http.client.HTTPConnection]:
+        """Take an idle connection for the host, if any."""
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+    
+    def _release(self, key: Tuple[str, str], conn: http.client.HTTPConnection) -> None:
+        """Return a connection to the pool, or close it if the pool is full."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Union[bytes, Iterable[bytes]]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Send a request, reusing an idle connection when possible.
+        
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            body: Request body. An iterable of bytes is streamed with chunked
+                transfer encoding; it must be re-iterable (not a generator)
+                because a request on a stale connection is retried once
+            headers: Request headers
+        
+        Returns:
+            int: HTTP status code
+        
+        Raises:
+            HTTPStatusError: If the server responds with a 4xx/5xx status
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        
+        route = self._proxy_for(*key)
+        if route and parts.scheme == "http":
+            # Plain HTTP proxies take the absolute URL as the request target
+            path = f"http://{parts.netloc}{path}"
+            if route[1]:
+                headers = {**(headers or {}), **route[1]}
+        
+        conn = self._checkout(key)
+        reused = conn is not None
+        if conn is None:
+            conn = self._new_connection(*key)
+        
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionError, http.client.BadStatusLine):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed the idle connection; retry once on a fresh one
+            conn = self._new_connection(*key)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+        
+        # Drain the body so the connection can carry the next request
+        try:
+            resp.read()
+        except Exception:
+            conn.close()
+            raise
+        
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        
+        if resp.status >= 400:
+            raise HTTPStatusError(url, resp.status, resp.reason)
+        return resp.status
+    
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
@@ -2,19 +2,27 @@
 Grafana Loki exporter.
 """
 
-import atexit
 import base64
-import json
+import collections
 import logging
 import threading
 import time
-import urllib.request
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import (
+    _SCHEDULER,
+    BaseExporter,
+    _json_dumpb,
+    _json_dumps,
+    _split_by_size,
+)
+from genai_telemetry.exporters.http import HTTPConnectionPool, gzip_body
 
 logger = logging.getLogger("genai_telemetry.exporters.loki")
 
+# Upper bound on cached label sets; label cardinality is normally tiny
+_LABEL_CACHE_SIZE = 1024
+
 
 class LokiExporter(BaseExporter):
     """Sends logs to Grafana Loki."""
@@ -27,7 +35,11 @@ class LokiExporter(BaseExporter):
         password: str = None,
         labels: Dict[str, str] = None,
         batch_size: int = 10,
-        flush_interval: float = 5.0
+        flush_interval: float = 5.0,
+        compress: bool = True,
+        max_batch_size: int = 1000,
+        max_batch_bytes: int = 4_000_000,
+        max_queue_size: int = 10_000
     ):
         """
         Initialize Loki exporter.
@@ -40,6 +52,12 @@ class LokiExporter(BaseExporter):
             labels: Default labels for all log streams
             batch_size: Number of logs to batch before sending
             flush_interval: Seconds between automatic flushes
+            compress: Whether to gzip request bodies
+            max_batch_size: Upper bound for the flush threshold, which grows
+                above batch_size while earlier pushes are still in flight
+            max_batch_bytes: Maximum size of log lines sent in one request
+            max_queue_size: Maximum number of buffered spans; the oldest are
+                dropped when the queue is full
         """
         self.url = url.rstrip("/") + "/loki/api/v1/push"
         self.tenant_id = tenant_id
@@ -48,104 +66,181 @@ class LokiExporter(BaseExporter):
         self.labels = labels or {"job": "genai-telemetry"}
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.compress = compress
+        self.max_batch_size = max(batch_size, max_batch_size)
+        self.max_batch_bytes = max_batch_bytes
         
-        self._batch: List[dict] = []
-        self._lock = threading.Lock()
-        self._flush_thread: Optional[threading.Thread] = None
+        # deque append/popleft are atomic, so producers never take a lock.
+        # The bound keeps memory flat if the backend stalls; the oldest spans
+        # are evicted first.
+        self.max_queue_size = max(max_queue_size, self.max_batch_size)
+        self._batch: Deque[dict] = collections.deque(maxlen=self.max_queue_size)
+        self._dropped = 0
+        self._dropped_logged = 0
+        self._dropped_at_check = 0
+        self._flush_handle: Optional[int] = None
         self._running = False
+        self._http = HTTPConnectionPool()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        # (span_type, model_name, workflow_name) -> encoded stream labels
+        self._label_cache: Dict[tuple, bytes] = {}
+        
+        # Headers never change, so build them once
+        self._headers = {"Content-Type": "application/json"}
+        if tenant_id:
+            self._headers["X-Scope-OrgID"] = tenant_id
+        if username and password:
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            self._headers["Authorization"] = f"Basic {credentials}"
         
-        atexit.register(self.stop)
+        _SCHEDULER.at_exit(self.stop)
     
     def start(self) -> None:
-        """Start the exporter and background flush thread."""
+        """Start the exporter and schedule periodic flushes."""
         if self._running:
             return
         self._running = True
         if self.batch_size > 1:
-            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-            self._flush_thread.start()
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
     
     def stop(self) -> None:
         """Stop the exporter and flush remaining data."""
         self._running = False
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
         self.flush()
+        self._http.close()
     
-    def _flush_loop(self) -> None:
-        """Background thread for periodic flushing."""
-        while self._running:
-            time.sleep(self.flush_interval)
-            self.flush()
+    def _batch_target(self) -> int:
+        """Batch size that triggers a flush; grows while sends are in flight."""
+        return min(self.max_batch_size, self.batch_size * (1 + self._in_flight))
     
     def flush(self) -> None:
         """Flush any buffered logs."""
-        with self._lock:
-            if not self._batch:
-                return
-            batch = self._batch.copy()
-            self._batch = []
-        self._send_batch(batch)
+        batch = []
+        popleft = self._batch.popleft
+        for _ in range(len(self._batch)):
+            try:
+                batch.append(popleft())
+            except IndexError:
+                break
+        if batch:
+            self._send_batch(batch)
+        
+        dropped = self._dropped
+        if dropped != self._dropped_logged:
+            logger.warning(f"Dropped {dropped - self._dropped_logged} spans because the queue was full")
+            self._dropped_logged = dropped
     
     def _get_headers(self) -> dict:
-        """Build authentication headers."""
-        headers = {"Content-Type": "application/json"}
-        if self.tenant_id:
-            headers["X-Scope-OrgID"] = self.tenant_id
-        if self.username and self.password:
-            credentials = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        return headers
+        """Return the shared request headers."""
+        return self._headers
+    
+    def _stream_labels(self, key: tuple) -> bytes:
+        """Encode the stream labels for a (span_type, model, workflow) key."""
+        span_type, model_name, workflow_name = key
+        labels = _json_dumpb({
+            **self.labels,
+            "span_type": span_type,
+            "model_name": model_name,
+            "workflow_name": workflow_name,
+        })
+        if len(self._label_cache) >= _LABEL_CACHE_SIZE:
+            self._label_cache.clear()
+        self._label_cache[key] = labels
+        return labels
     
     def _send_batch(self, batch: List[dict]) -> bool:
         """Send a batch of logs to Loki."""
         if not batch:
             return True
         
-        # Group by labels
-        streams = {}
-        for span in batch:
-            # Build labels for this span
-            labels = {
-                **self.labels,
-                "span_type": span.get("span_type", "UNKNOWN"),
-                "model_name": span.get("model_name", "unknown"),
-                "workflow_name": span.get("workflow_name", "unknown"),
-            }
-            label_str = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
-            
-            if label_str not in streams:
-                streams[label_str] = {"stream": labels, "values": []}
-            
-            # Timestamp in nanoseconds
-            ts_ns = str(int(time.time() * 1e9))
-            log_line = json.dumps(span)
-            streams[label_str]["values"].append([ts_ns, log_line])
+        # Each log line is the span's JSON, encoded once more as a JSON string
+        entries = [(span, _json_dumpb(_json_dumps(span))) for span in batch]
+        sizes = [len(log_line) for _, log_line in entries]
+        
+        ok = True
+        for chunk in _split_by_size(entries, sizes, self.max_batch_size, self.max_batch_bytes):
+            ok = self._push(chunk) and ok
+        return ok
+    
+    def _push(self, entries: List[tuple]) -> bool:
+        """Push one request's worth of (span, encoded log line) entries to Loki."""
+        # Timestamp in nanoseconds, shared by every entry in the push
+        ts_prefix = b'["' + str(time.time_ns()).encode() + b'",'
+        
+        # Group by labels, appending each stream's values straight into a buffer
+        streams: Dict[tuple, bytearray] = {}
+        for span, log_line in entries:
+            key = (
+                span.get("span_type", "UNKNOWN"),
+                span.get("model_name", "unknown"),
+                span.get("workflow_name", "unknown"),
+            )
+            values = streams.get(key)
+            if values is None:
+                values = streams[key] = bytearray()
+            else:
+                values += b","
+            values += ts_prefix
+            values += log_line
+            values += b"]"
         
-        payload = {"streams": list(streams.values())}
-        data = json.dumps(payload).encode("utf-8")
+        label_cache = self._label_cache
+        data = bytearray(b'{"streams":[')
+        for i, (key, values) in enumerate(streams.items()):
+            if i:
+                data += b","
+            data += b'{"stream":'
+            data += label_cache.get(key) or self._stream_labels(key)
+            data += b',"values":['
+            data += values
+            data += b"]}"
+        data += b"]}"
         
-        req = urllib.request.Request(
-            self.url,
-            data=data,
-            headers=self._get_headers(),
-            method="POST"
-        )
+        headers = self._get_headers()
+        if self.compress:
+            data, headers = gzip_body(data, headers)
         
+        with self._in_flight_lock:
+            self._in_flight += 1
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                return resp.status in (200, 204)
+            status = self._http.request("POST", self.url, body=data, headers=headers)
+            return status in (200, 204)
         except Exception as e:
             logger.error(f"Loki Error: {e}")
             return False
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
     
     def export(self, span_data: Dict[str, Any]) -> bool:
         """Export a single span as a log entry."""
         if self.batch_size <= 1:
             return self._send_batch([span_data])
         
-        with self._lock:
-            self._batch.append(span_data)
-            should_flush = len(self._batch) >= self.batch_size
-        
-        if should_flush:
-            self.flush()
+        if len(self._batch) == self.max_queue_size:
+            self._dropped += 1
+        self._batch.append(span_data)
+        if len(self._batch) >= self._batch_target():
+            # Hand the send to the flush thread when running, so the caller
+            # doesn't block on HTTP
+            if self._flush_handle is not None:
+                _SCHEDULER.trigger(self._flush_handle)
+            else:
+                self.flush()
         return True
+    
+    @property
+    def dropped(self) -> int:
+        """Number of spans dropped because the queue was full."""
+        return self._dropped
+    
+    def health_check(self) -> bool:
+        """Report unhealthy if spans were dropped since the last check."""
+        dropped = self._dropped
+        healthy = dropped == self._dropped_at_check
+        self._dropped_at_check = dropped
+        return healthy
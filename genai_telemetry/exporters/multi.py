@@ -3,7 +3,8 @@ Multi-exporter for sending spans to multiple backends simultaneously.
 """
 
 import logging
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 from genai_telemetry.exporters.base import BaseExporter
 
@@ -13,14 +14,22 @@ logger = logging.getLogger("genai_telemetry.exporters.multi")
 class MultiExporter(BaseExporter):
     """Sends spans to multiple exporters simultaneously."""
     
-    def __init__(self, exporters: List[BaseExporter]):
+    def __init__(self, exporters: List[BaseExporter], timeout: float = 30.0):
         """
         Initialize multi-exporter.
         
         Args:
             exporters: List of exporter instances to send spans to
+            timeout: Seconds to wait for each exporter when exporting in parallel
         """
         self.exporters = exporters
+        self.timeout = timeout
+        # Fan out concurrently so a span costs the slowest exporter, not the sum
+        self._pool: Optional[ThreadPoolExecutor] = None
+        if len(exporters) > 1:
+            self._pool = ThreadPoolExecutor(
+                max_workers=len(exporters), thread_name_prefix="genai-telemetry-multi"
+            )
     
     def export(self, span_data: Dict[str, Any]) -> bool:
         """
@@ -28,29 +37,90 @@ class MultiExporter(BaseExporter):
         
         Returns True if at least one exporter succeeds.
         """
+        return self._export_all("export", span_data)
+    
+    def export_batch(self, spans: List[Dict[str, Any]]) -> bool:
+        """
+        Export spans to all configured exporters, one batch call each.
+        
+        Returns True if at least one exporter succeeds.
+        """
+        return self._export_all("export_batch", spans)
+    
+    def _export_all(self, method: str, data: Any) -> bool:
+        """Call an export method on every exporter; True if any succeeds."""
+        exporters = self.exporters
+        pending = exporters
+        futures = []
+        pool = self._pool
+        if pool is not None:
+            pending = []
+            for i, exp in enumerate(exporters):
+                try:
+                    futures.append(pool.submit(getattr(exp, method), data))
+                except RuntimeError:
+                    # The pool refuses new work during interpreter shutdown or
+                    # after stop(); export the rest on this thread
+                    pending = exporters[i:]
+                    break
+        
         results = []
-        for exp in self.exporters:
+        for exp in pending:
             try:
-                results.append(exp.export(span_data))
+                results.append(getattr(exp, method)(data))
+            except Exception as e:
+                logger.error(f"Exporter error: {e}")
+                results.append(False)
+        for future in futures:
+            try:
+                results.append(future.result(timeout=self.timeout))
             except Exception as e:
                 logger.error(f"Exporter error: {e}")
                 results.append(False)
         return any(results)
     
+    def _call_all(self, method: str) -> None:
+        """Call a no-argument method on every exporter, concurrently when pooled."""
+        exporters = self.exporters
+        pending = exporters
+        futures = []
+        pool = self._pool
+        if pool is not None:
+            pending = []
+            for i, exp in enumerate(exporters):
+                try:
+                    futures.append(pool.submit(getattr(exp, method)))
+                except RuntimeError:
+                    # The pool refuses new work during interpreter shutdown;
+                    # run the rest on this thread
+                    pending = exporters[i:]
+                    break
+        
+        for exp in pending:
+            try:
+                getattr(exp, method)()
+            except Exception as e:
+                logger.error(f"Exporter error: {e}")
+        for future in futures:
+            try:
+                future.result(timeout=self.timeout)
+            except Exception as e:
+                logger.error(f"Exporter error: {e}")
+    
     def start(self) -> None:
         """Start all exporters."""
-        for exp in self.exporters:
-            exp.start()
+        self._call_all("start")
     
     def stop(self) -> None:
-        """Stop all exporters."""
-        for exp in self.exporters:
-            exp.stop()
+        """Stop all exporters, flushing them concurrently."""
+        self._call_all("stop")
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False)
     
     def flush(self) -> None:
-        """Flush all exporters."""
-        for exp in self.exporters:
-            exp.flush()
+        """Flush all exporters concurrently."""
+        self._call_all("flush")
     
     def health_check(self) -> bool:
         """Check if any exporter is healthy."""
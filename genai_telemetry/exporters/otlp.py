@@ -3,22 +3,152 @@ OpenTelemetry Protocol (OTLP) exporter.
 Compatible with: Datadog, Jaeger, Zipkin, Tempo, etc.
 """
 
-import atexit
-import json
+import collections
+import hashlib
 import logging
-import ssl
-import threading
+import os
+import random
+import struct
 import time
-import uuid
-import urllib.request
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional
 
 import genai_telemetry
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import _SCHEDULER, BaseExporter, _json_dumpb
+from genai_telemetry.exporters.http import HTTPConnectionPool, default_ssl_context
 
 logger = logging.getLogger("genai_telemetry.exporters.otlp")
 
+# Private generator, unaffected by random.seed() in the application and
+# reseeded after fork
+_random = random.Random(os.urandom(16))
+_getrandbits = _random.getrandbits
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _random.seed(os.urandom(16)))
+
+# Span fields that map to dedicated OTLP fields rather than attributes
+_SKIP_ATTRIBUTES = frozenset((
+    "trace_id", "span_id", "parent_span_id", "timestamp", "start_time_ns",
+    "duration_ms", "name", "status",
+))
+
+_INT64_MASK = (1 << 64) - 1
+_pack_double = struct.Struct("<d").pack
+_pack_fixed64 = struct.Struct("<Q").pack
+
+
+def _json_any_value(value: Any) -> dict:
+    """OTLP/JSON AnyValue for types without a dispatch entry (e.g. int subclasses)."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# OTLP/JSON carries int64 as strings; token counts are mostly small, so their
+# string forms are built once
+_SMALL_INT_STR = tuple(str(i) for i in range(8192))
+
+
+def _json_int_value(value: int) -> dict:
+    """OTLP/JSON intValue, with small non-negative ints taken from the cache."""
+    if 0 <= value < 8192:
+        return {"intValue": _SMALL_INT_STR[value]}
+    return {"intValue": str(value)}
+
+
+# Exact-type dispatch, so common attribute values skip the isinstance chain
+_JSON_ANY_VALUE = {
+    str: lambda v: {"stringValue": v},
+    int: _json_int_value,
+    float: lambda v: {"doubleValue": v},
+    bool: lambda v: {"boolValue": v},
+}
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_fromisoformat = datetime.fromisoformat
+
+
+def _start_time_ns(span: dict, now_ns: int) -> int:
+    """Span start time in nanoseconds, falling back to now_ns."""
+    # Spans from Span.to_dict() carry the exact integer start time
+    start_time_ns = span.get("start_time_ns")
+    if start_time_ns:
+        return start_time_ns
+    
+    ts = span.get("timestamp")
+    if not isinstance(ts, str):
+        return now_ns
+    if ts.endswith("Z"):
+        ts = ts[:-1] + "+00:00"
+    dt = _fromisoformat(ts)
+    if dt.tzinfo is None:
+        return int(dt.timestamp() * 1e9)
+    # Integer arithmetic keeps microsecond precision that a float would lose
+    return (dt - _EPOCH) // _MICROSECOND * 1000
+
+
+# Minimal protobuf encoder for opentelemetry.proto.trace.v1, so the binary
+# OTLP protocol needs no generated classes or protobuf runtime
+
+def _varint(value: int) -> bytes:
+    """Encode an unsigned varint."""
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _ld(tag: bytes, data: bytes) -> bytes:
+    """Encode a length-delimited field; tag is the pre-encoded field key."""
+    return tag + _varint(len(data)) + data
+
+
+def _proto_id(value: Any, size: int) -> bytes:
+    """Encode a hex trace/span ID as raw bytes of the given size."""
+    if isinstance(value, str):
+        try:
+            raw = bytes.fromhex(value)
+            if len(raw) == size:
+                return raw
+        except ValueError:
+            pass
+        # Non-hex IDs are hashed so parent/child links stay consistent
+        return hashlib.blake2b(value.encode("utf-8"), digest_size=size).digest()
+    return _getrandbits(size * 8).to_bytes(size, "big")
+
+
+def _proto_any_value(value: Any) -> bytes:
+    """Encode an AnyValue for types without a dispatch entry (e.g. int subclasses)."""
+    if isinstance(value, bool):
+        return b"\x10\x01" if value else b"\x10\x00"
+    if isinstance(value, int):
+        return b"\x18" + _varint(value & _INT64_MASK)
+    if isinstance(value, float):
+        return b"\x21" + _pack_double(value)
+    return _ld(b"\x0a", str(value).encode("utf-8"))
+
+
+_PROTO_ANY_VALUE = {
+    str: lambda v: _ld(b"\x0a", v.encode("utf-8")),
+    int: lambda v: b"\x18" + _varint(v & _INT64_MASK),
+    float: lambda v: b"\x21" + _pack_double(v),
+    bool: lambda v: b"\x10\x01" if v else b"\x10\x00",
+}
+
+
+def _proto_key_value(key: str, value: Any) -> bytes:
+    """Encode a KeyValue with the AnyValue variant matching the Python type."""
+    any_value = (_PROTO_ANY_VALUE.get(type(value)) or _proto_any_value)(value)
+    return _ld(b"\x0a", key.encode("utf-8")) + _ld(b"\x12", any_value)
+
 
 class OTLPExporter(BaseExporter):
     """
@@ -33,7 +163,9 @@ class OTLPExporter(BaseExporter):
         service_name: str = "genai-app",
         verify_ssl: bool = True,
         batch_size: int = 10,
-        flush_interval: float = 5.0
+        flush_interval: float = 5.0,
+        protocol: str = "http/json",
+        max_queue_size: int = 10_000
     ):
         """
         Initialize OTLP exporter.
@@ -45,6 +177,9 @@ class OTLPExporter(BaseExporter):
             verify_ssl: Whether to verify SSL certificates
             batch_size: Number of spans to batch before sending
             flush_interval: Seconds between automatic flushes
+            protocol: "http/json" or "http/protobuf" (smaller, cheaper to encode)
+            max_queue_size: Maximum number of buffered spans; the oldest are
+                dropped when the queue is full
         """
         self.endpoint = endpoint.rstrip("/")
         if not self.endpoint.endswith("/v1/traces"):
@@ -54,84 +189,98 @@ class OTLPExporter(BaseExporter):
         self.service_name = service_name
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        if protocol not in ("http/json", "http/protobuf"):
+            raise ValueError(f"Unsupported OTLP protocol: {protocol}")
+        self.protocol = protocol
         
-        self.ssl_context = ssl.create_default_context()
-        if not verify_ssl:
-            self.ssl_context.check_hostname = False
-            self.ssl_context.verify_mode = ssl.CERT_NONE
+        # The resource and scope are fixed for the exporter's lifetime; they
+        # are shared by every batch, never mutated, so concurrent flushes are safe
+        self._resource = {
+            "attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]
+        }
+        self._scope = {"name": "genai-telemetry", "version": genai_telemetry.__version__}
+        self._proto_resource = _ld(b"\x0a", _ld(b"\x0a", _proto_key_value("service.name", service_name)))
+        self._proto_scope = _ld(b"\x0a", (
+            _ld(b"\x0a", b"genai-telemetry")
+            + _ld(b"\x12", genai_telemetry.__version__.encode("utf-8"))
+        ))
         
-        self._batch: List[dict] = []
-        self._lock = threading.Lock()
-        self._flush_thread: Optional[threading.Thread] = None
+        self.ssl_context = default_ssl_context(verify_ssl)
+        
+        # deque append/popleft are atomic, so producers never take a lock.
+        # The bound keeps memory flat if the collector stalls; the oldest
+        # spans are evicted first.
+        self.max_queue_size = max(max_queue_size, batch_size)
+        self._batch: Deque[Any] = collections.deque(maxlen=self.max_queue_size)
+        self._dropped = 0
+        self._dropped_logged = 0
+        self._dropped_at_check = 0
+        self._http = HTTPConnectionPool(ssl_context=self.ssl_context)
+        self._flush_handle: Optional[int] = None
         self._running = False
         
-        atexit.register(self.stop)
+        _SCHEDULER.at_exit(self.stop)
     
     def start(self) -> None:
-        """Start the exporter and background flush thread."""
+        """Start the exporter and schedule periodic flushes."""
         if self._running:
             return
         self._running = True
         if self.batch_size > 1:
-            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-            self._flush_thread.start()
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
     
     def stop(self) -> None:
         """Stop the exporter and flush remaining data."""
         self._running = False
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
         self.flush()
-    
-    def _flush_loop(self) -> None:
-        """Background thread for periodic flushing."""
-        while self._running:
-            time.sleep(self.flush_interval)
-            self.flush()
+        self._http.close()
     
     def flush(self) -> None:
         """Flush any buffered spans."""
-        with self._lock:
-            if not self._batch:
-                return
-            batch = self._batch.copy()
-            self._batch = []
-        self._send_batch(batch)
+        batch = []
+        popleft = self._batch.popleft
+        for _ in range(len(self._batch)):
+            try:
+                span = popleft()
+            except IndexError:
+                break
+            # Spans queued by export_span() are converted here, off the caller's thread
+            batch.append(span if type(span) is dict else span.to_dict())
+        if batch:
+            self._send_batch(batch)
+        
+        dropped = self._dropped
+        if dropped != self._dropped_logged:
+            logger.warning(f"Dropped {dropped - self._dropped_logged} spans because the queue was full")
+            self._dropped_logged = dropped
     
     def _convert_to_otlp(self, spans: List[dict]) -> dict:
         """Convert internal span format to OTLP format."""
         otlp_spans = []
+        # Fallback start time for spans without a timestamp, read once per batch
+        now_ns = time.time_ns()
+        any_value = _JSON_ANY_VALUE.get
         
         for span in spans:
-            # Convert timestamp to nanoseconds
-            ts = span.get("timestamp", datetime.now(timezone.utc).isoformat())
-            if isinstance(ts, str):
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                start_time_ns = int(dt.timestamp() * 1e9)
-            else:
-                start_time_ns = int(time.time() * 1e9)
-            
+            start_time_ns = _start_time_ns(span, now_ns)
             duration_ms = span.get("duration_ms", 0)
             end_time_ns = start_time_ns + int(duration_ms * 1e6)
             
             # Build attributes
-            attributes = []
-            for key, value in span.items():
-                if key in ("trace_id", "span_id", "parent_span_id", "timestamp", "duration_ms", "name", "status"):
-                    continue
-                
-                attr = {"key": key}
-                if isinstance(value, bool):
-                    attr["value"] = {"boolValue": value}
-                elif isinstance(value, int):
-                    attr["value"] = {"intValue": str(value)}
-                elif isinstance(value, float):
-                    attr["value"] = {"doubleValue": value}
-                else:
-                    attr["value"] = {"stringValue": str(value)}
-                attributes.append(attr)
+            attributes = [
+                {"key": key, "value": (any_value(type(value)) or _json_any_value)(value)}
+                for key, value in span.items()
+                if key not in _SKIP_ATTRIBUTES
+            ]
             
             otlp_span = {
-                "traceId": span.get("trace_id", uuid.uuid4().hex),
-                "spanId": span.get("span_id", uuid.uuid4().hex[:16]),
+                # IDs are only generated when missing; a default argument
+                # would be evaluated for every span
+                "traceId": span.get("trace_id") or f"{_getrandbits(128):032x}",
+                "spanId": span.get("span_id") or f"{_getrandbits(64):016x}",
                 "name": span.get("name", "unknown"),
                 "kind": 1,  # INTERNAL
                 "startTimeUnixNano": str(start_time_ns),
@@ -149,43 +298,61 @@ class OTLPExporter(BaseExporter):
         
         return {
             "resourceSpans": [{
-                "resource": {
-                    "attributes": [
-                        {"key": "service.name", "value": {"stringValue": self.service_name}}
-                    ]
-                },
-                "scopeSpans": [{
-                    "scope": {"name": "genai-telemetry", "version": genai_telemetry.__version__},
-                    "spans": otlp_spans
-                }]
+                "resource": self._resource,
+                "scopeSpans": [{"scope": self._scope, "spans": otlp_spans}]
             }]
         }
     
+    def _encode_otlp_proto(self, spans: List[dict]) -> bytes:
+        """Encode spans as a protobuf ExportTraceServiceRequest."""
+        now_ns = time.time_ns()
+        encoded_spans = bytearray()
+        
+        for span in spans:
+            start_time_ns = _start_time_ns(span, now_ns)
+            end_time_ns = start_time_ns + int(span.get("duration_ms", 0) * 1e6)
+            
+            body = bytearray()
+            body += _ld(b"\x0a", _proto_id(span.get("trace_id"), 16))
+            body += _ld(b"\x12", _proto_id(span.get("span_id"), 8))
+            if span.get("parent_span_id"):
+                body += _ld(b"\x22", _proto_id(span["parent_span_id"], 8))
+            body += _ld(b"\x2a", str(span.get("name", "unknown")).encode("utf-8"))
+            body += b"\x30\x01"  # kind: INTERNAL
+            body += b"\x39" + _pack_fixed64(start_time_ns & _INT64_MASK)
+            body += b"\x41" + _pack_fixed64(end_time_ns & _INT64_MASK)
+            for key, value in span.items():
+                if key not in _SKIP_ATTRIBUTES:
+                    body += _ld(b"\x4a", _proto_key_value(key, value))
+            # status.code: ERROR or OK
+            body += _ld(b"\x7a", b"\x18\x02" if span.get("is_error") else b"\x18\x01")
+            
+            encoded_spans += _ld(b"\x12", body)
+        
+        scope_spans = self._proto_scope + encoded_spans
+        resource_spans = self._proto_resource + _ld(b"\x12", scope_spans)
+        return _ld(b"\x0a", resource_spans)
+    
     def _send_batch(self, batch: List[dict]) -> bool:
         """Send a batch of spans to OTLP collector."""
         if not batch:
             return True
         
-        otlp_payload = self._convert_to_otlp(batch)
-        payload = json.dumps(otlp_payload)
-        data = payload.encode("utf-8")
+        if self.protocol == "http/protobuf":
+            data = self._encode_otlp_proto(batch)
+            content_type = "application/x-protobuf"
+        else:
+            data = _json_dumpb(self._convert_to_otlp(batch))
+            content_type = "application/json"
         
         headers = {
-            "Content-Type": "application/json",
+            "Content-Type": content_type,
             **self.headers
         }
         
-        req = urllib.request.Request(
-            self.endpoint,
-            data=data,
-            headers=headers,
-            method="POST"
-        )
-        
         try:
-            ctx = self.ssl_context if self.endpoint.startswith("https") else None
-            with urllib.request.urlopen(req, context=ctx, timeout=10) as resp:
-                return resp.status == 200
+            status = self._http.request("POST", self.endpoint, body=data, headers=headers)
+            return status == 200
         except Exception as e:
             logger.error(f"OTLP Error: {e}")
             return False
@@ -194,11 +361,36 @@ class OTLPExporter(BaseExporter):
         """Export a single span."""
         if self.batch_size <= 1:
             return self._send_batch([span_data])
-        
-        with self._lock:
-            self._batch.append(span_data)
-            should_flush = len(self._batch) >= self.batch_size
-        
-        if should_flush:
-            self.flush()
+        return self._enqueue(span_data)
+    
+    def export_span(self, span: Any) -> bool:
+        """Export a finished Span, deferring to_dict() to the flush."""
+        if self.batch_size <= 1:
+            return self._send_batch([span.to_dict()])
+        return self._enqueue(span)
+    
+    def _enqueue(self, span: Any) -> bool:
+        """Queue a span dict or Span and hand a full batch to the flush thread."""
+        if len(self._batch) == self.max_queue_size:
+            self._dropped += 1
+        self._batch.append(span)
+        if len(self._batch) >= self.batch_size:
+            # Hand the send to the flush thread when running, so the traced
+            # call doesn't block on the collector
+            if self._flush_handle is not None:
+                _SCHEDULER.trigger(self._flush_handle)
+            else:
+                self.flush()
         return True
+    
+    @property
+    def dropped(self) -> int:
+        """Number of spans dropped because the queue was full."""
+        return self._dropped
+    
+    def health_check(self) -> bool:
+        """Report unhealthy if spans were dropped since the last check."""
+        dropped = self._dropped
+        healthy = dropped == self._dropped_at_check
+        self._dropped_at_check = dropped
+        return healthy
@@ -3,25 +3,41 @@ Prometheus Push Gateway exporter.
 """
 
 import base64
+import bisect
 import logging
 import threading
-import urllib.request
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import _SCHEDULER, BaseExporter
+from genai_telemetry.exporters.http import HTTPConnectionPool
 
 logger = logging.getLogger("genai_telemetry.exporters.prometheus")
 
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_BUCKET_LABELS = tuple(f',le="{bound}"}}' for bound in DURATION_BUCKETS) + (',le="+Inf"}',)
+
+
+def _label_value(value: Any) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
 
 class PrometheusExporter(BaseExporter):
-    """Sends metrics to Prometheus Push Gateway."""
+    """
+    Sends metrics to Prometheus Push Gateway.
+    
+    Spans only update in-memory counters; the full set of series is pushed
+    every push_interval seconds rather than once per span.
+    """
     
     def __init__(
         self,
         pushgateway_url: str = "http://localhost:9091",
         job_name: str = "genai_telemetry",
         username: str = None,
-        password: str = None
+        password: str = None,
+        push_interval: float = 10.0
     ):
         """
         Initialize Prometheus exporter.
@@ -31,92 +47,152 @@ class PrometheusExporter(BaseExporter):
             job_name: Job name for metrics grouping
             username: Username for basic auth (optional)
             password: Password for basic auth (optional)
+            push_interval: Seconds between pushes; 0 pushes on every export
         """
         self.pushgateway_url = pushgateway_url.rstrip("/")
         self.job_name = job_name
         self.username = username
         self.password = password
+        self.push_interval = push_interval
         
-        # Metrics storage
-        self._metrics: Dict[str, Dict] = {
-            "llm_requests_total": {"type": "counter", "value": 0},
-            "llm_duration_seconds": {"type": "histogram", "values": []},
-            "llm_tokens_total": {"type": "counter", "input": 0, "output": 0},
-            "llm_errors_total": {"type": "counter", "value": 0},
-        }
+        # The push URL and headers never change, so build them once
+        self._push_url = f"{self.pushgateway_url}/metrics/job/{job_name}"
+        self._headers = {"Content-Type": "text/plain"}
+        if username and password:
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            self._headers["Authorization"] = f"Basic {credentials}"
+        
+        # Counters per label set:
+        # (model, provider, workflow) -> [requests, errors]
+        # (model, provider) -> [input tokens, output tokens, last duration, duration sum]
+        # (model, provider) -> duration count per bucket, the last one for +Inf
+        self._requests: Dict[Tuple[str, str, str], List[int]] = {}
+        self._models: Dict[Tuple[str, str], List[float]] = {}
+        self._buckets: Dict[Tuple[str, str], List[int]] = {}
+        # Label set key -> rendered, escaped labels, built once per new series
+        self._labels: Dict[tuple, str] = {}
+        self._dirty = False
         self._lock = threading.Lock()
+        self._http = HTTPConnectionPool()
+        self._flush_handle: Optional[int] = None
+        
+        _SCHEDULER.at_exit(self.stop)
     
-    def _get_headers(self) -> dict:
-        """Build authentication headers."""
-        headers = {"Content-Type": "text/plain"}
-        if self.username and self.password:
-            credentials = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        return headers
+    def start(self) -> None:
+        """Schedule periodic pushes to the gateway."""
+        if self._flush_handle is None and self.push_interval > 0:
+            self._flush_handle = _SCHEDULER.register(self.push_interval, self.flush)
     
-    def export(self, span_data: Dict[str, Any]) -> bool:
-        """Update metrics and push to gateway."""
-        with self._lock:
-            # Update counters
-            self._metrics["llm_requests_total"]["value"] += 1
-            
-            if span_data.get("is_error"):
-                self._metrics["llm_errors_total"]["value"] += 1
-            
-            # Update tokens
-            self._metrics["llm_tokens_total"]["input"] += span_data.get("input_tokens", 0)
-            self._metrics["llm_tokens_total"]["output"] += span_data.get("output_tokens", 0)
-            
-            # Update duration histogram
-            duration_sec = span_data.get("duration_ms", 0) / 1000
-            self._metrics["llm_duration_seconds"]["values"].append(duration_sec)
-        
-        return self._push_metrics(span_data)
+    def stop(self) -> None:
+        """Push pending metrics and close pooled connections to the gateway."""
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
+        self.flush()
+        self._http.close()
+    
+    def flush(self) -> None:
+        """Push metrics if any changed since the last push."""
+        if self._dirty:
+            with self._lock:
+                snapshot = self._snapshot()
+            if not self._push_metrics(snapshot):
+                # Retry on the next interval and on stop()
+                self._dirty = True
     
-    def _push_metrics(self, span_data: Dict[str, Any]) -> bool:
-        """Push metrics to Prometheus Push Gateway."""
+    def export(self, span_data: Dict[str, Any]) -> bool:
+        """Update metrics; they are pushed on the next interval."""
         model = span_data.get("model_name", "unknown")
         provider = span_data.get("model_provider", "unknown")
         workflow = span_data.get("workflow_name", "unknown")
-        
-        # Build Prometheus text format
-        lines = []
+        duration_sec = span_data.get("duration_ms", 0) / 1000
         
         with self._lock:
-            # Counter: requests
-            lines.append('# TYPE llm_requests_total counter')
-            lines.append(f'llm_requests_total{{model="{model}",provider="{provider}",workflow="{workflow}"}} {self._metrics["llm_requests_total"]["value"]}')
+            series = self._requests.get((model, provider, workflow))
+            if series is None:
+                series = self._requests[(model, provider, workflow)] = [0, 0]
+                self._labels[(model, provider, workflow)] = (
+                    f'{{model="{_label_value(model)}",provider="{_label_value(provider)}",workflow="{_label_value(workflow)}"'
+                )
+            series[0] += 1
+            if span_data.get("is_error"):
+                series[1] += 1
             
-            # Counter: errors
-            lines.append('# TYPE llm_errors_total counter')
-            lines.append(f'llm_errors_total{{model="{model}",provider="{provider}",workflow="{workflow}"}} {self._metrics["llm_errors_total"]["value"]}')
+            totals = self._models.get((model, provider))
+            if totals is None:
+                totals = self._models[(model, provider)] = [0, 0, 0.0, 0.0]
+                self._buckets[(model, provider)] = [0] * (len(DURATION_BUCKETS) + 1)
+                self._labels[(model, provider)] = f'{{model="{_label_value(model)}",provider="{_label_value(provider)}"'
+            totals[0] += span_data.get("input_tokens", 0)
+            totals[1] += span_data.get("output_tokens", 0)
+            totals[2] = duration_sec
+            totals[3] += duration_sec
             
-            # Counter: tokens
-            lines.append('# TYPE llm_input_tokens_total counter')
-            lines.append(f'llm_input_tokens_total{{model="{model}",provider="{provider}"}} {self._metrics["llm_tokens_total"]["input"]}')
-            lines.append('# TYPE llm_output_tokens_total counter')
-            lines.append(f'llm_output_tokens_total{{model="{model}",provider="{provider}"}} {self._metrics["llm_tokens_total"]["output"]}')
+            # Only bucket counts are kept, so memory stays flat however many
+            # spans are observed
+            self._buckets[(model, provider)][bisect.bisect_left(DURATION_BUCKETS, duration_sec)] += 1
+            self._dirty = True
             
-            # Gauge: last duration
-            duration_sec = span_data.get("duration_ms", 0) / 1000
-            lines.append('# TYPE llm_duration_seconds gauge')
-            lines.append(f'llm_duration_seconds{{model="{model}",provider="{provider}"}} {duration_sec}')
+            # Per-span pushes snapshot in the same critical section
+            snapshot = self._snapshot() if self.push_interval <= 0 else None
         
-        payload = "\n".join(lines) + "\n"
+        if snapshot is not None:
+            if self._push_metrics(snapshot):
+                return True
+            self._dirty = True
+            return False
+        return True
+    
+    def _snapshot(self) -> Tuple[list, list]:
+        """Copy the current counter values with their labels. Caller must hold the lock."""
+        self._dirty = False
+        labels = self._labels
+        buckets = self._buckets
+        requests = [(labels[key], series[0], series[1]) for key, series in self._requests.items()]
+        models = [(labels[key], *totals, tuple(buckets[key])) for key, totals in self._models.items()]
+        return requests, models
+    
+    def _push_metrics(self, snapshot: Tuple[list, list]) -> bool:
+        """Push a snapshot of all metric series to Prometheus Push Gateway."""
+        requests, models = snapshot
         
-        url = f"{self.pushgateway_url}/metrics/job/{self.job_name}"
-        data = payload.encode("utf-8")
+        # Build Prometheus text format from the cached label strings, outside
+        # the lock; each label string is "{..." and is closed by the format
+        parts = []
         
-        req = urllib.request.Request(
-            url,
-            data=data,
-            headers=self._get_headers(),
-            method="POST"
-        )
+        # Counters: requests and errors
+        parts.append("# TYPE llm_requests_total counter\n")
+        parts.extend("llm_requests_total%s} %d\n" % (label, count) for label, count, _ in requests)
+        parts.append("# TYPE llm_errors_total counter\n")
+        parts.extend("llm_errors_total%s} %d\n" % (label, errors) for label, _, errors in requests)
+        
+        # Counters: tokens
+        parts.append("# TYPE llm_input_tokens_total counter\n")
+        parts.extend("llm_input_tokens_total%s} %s\n" % (m[0], m[1]) for m in models)
+        parts.append("# TYPE llm_output_tokens_total counter\n")
+        parts.extend("llm_output_tokens_total%s} %s\n" % (m[0], m[2]) for m in models)
+        
+        # Gauge: last duration
+        parts.append("# TYPE llm_duration_seconds gauge\n")
+        parts.extend("llm_duration_seconds%s} %s\n" % (m[0], m[3]) for m in models)
+        
+        # Histogram: request duration, with cumulative bucket counts
+        parts.append("# TYPE llm_request_duration_seconds histogram\n")
+        for label, _, _, _, duration_sum, counts in models:
+            cumulative = 0
+            for bucket_label, count in zip(_BUCKET_LABELS, counts):
+                cumulative += count
+                parts.append("llm_request_duration_seconds_bucket%s%s %d\n" % (label, bucket_label, cumulative))
+            parts.append("llm_request_duration_seconds_sum%s} %s\n" % (label, duration_sum))
+            parts.append("llm_request_duration_seconds_count%s} %d\n" % (label, cumulative))
+        
+        payload = "".join(parts)
+        
+        data = payload.encode("utf-8")
         
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                return resp.status in (200, 202)
+            status = self._http.request("POST", self._push_url, body=data, headers=self._headers)
+            return status in (200, 202)
         except Exception as e:
             logger.error(f"Prometheus Push Error: {e}")
             return False
@@ -2,21 +2,57 @@
 Splunk HTTP Event Collector (HEC) exporter.
 """
 
-import atexit
-import json
+import collections
+import itertools
 import logging
-import ssl
 import threading
-import time
-import urllib.error
-import urllib.request
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Union
 
-from genai_telemetry.exporters.base import BaseExporter
+from genai_telemetry.exporters.base import _SCHEDULER, BaseExporter, _json_dumpb
+from genai_telemetry.exporters.http import (
+    STREAM_CHUNK_SIZE,
+    GzipStream,
+    HTTPConnectionPool,
+    default_ssl_context,
+    gzip_body,
+)
 
 logger = logging.getLogger("genai_telemetry.exporters.splunk")
 
 
+class _EventStream:
+    """
+    Newline-delimited HEC events, encoded lazily in chunks of about chunk_size bytes.
+    
+    Iterating again re-encodes from the start, so the pool can retry the request.
+    """
+    
+    __slots__ = ("prefix", "batch", "chunk_size")
+    
+    def __init__(self, prefix: bytes, batch: List[dict], chunk_size: int = STREAM_CHUNK_SIZE):
+        self.prefix = prefix
+        self.batch = batch
+        self.chunk_size = chunk_size
+    
+    def __iter__(self) -> Iterator[bytes]:
+        prefix = self.prefix
+        chunk_size = self.chunk_size
+        buf = bytearray()
+        separator = b""
+        for span in self.batch:
+            buf += separator
+            buf += prefix
+            buf += _json_dumpb(span)
+            buf += b"}"
+            separator = b"\n"
+            if len(buf) >= chunk_size:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
+
+
 class SplunkHECExporter(BaseExporter):
     """Sends spans to Splunk via HTTP Event Collector (HEC)."""
     
@@ -28,7 +64,10 @@ class SplunkHECExporter(BaseExporter):
         sourcetype: str = "genai:trace",
         verify_ssl: bool = False,
         batch_size: int = 1,
-        flush_interval: float = 5.0
+        flush_interval: float = 5.0,
+        max_connections: int = 4,
+        max_batch_bytes: Optional[int] = 900_000,
+        compress: bool = True
     ):
         """
         Initialize Splunk HEC exporter.
@@ -41,6 +80,12 @@ class SplunkHECExporter(BaseExporter):
             verify_ssl: Whether to verify SSL certificates
             batch_size: Number of events to batch before sending
             flush_interval: Seconds between automatic flushes
+            max_connections: Maximum number of keep-alive connections kept to HEC,
+                and of requests sent concurrently when a batch is split
+            max_batch_bytes: Maximum request body size; larger batches are split
+                across requests. Splunk Cloud rejects bodies over 1 MB. None
+                streams each batch as one chunked request
+            compress: Whether to gzip request bodies
         """
         self.hec_url = hec_url.rstrip("/")
         if not self.hec_url.endswith("/services/collector/event"):
@@ -51,97 +96,174 @@ class SplunkHECExporter(BaseExporter):
         self.sourcetype = sourcetype
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.max_batch_bytes = max_batch_bytes
+        self.compress = compress
         
-        self.ssl_context = ssl.create_default_context()
-        if not verify_ssl:
-            self.ssl_context.check_hostname = False
-            self.ssl_context.verify_mode = ssl.CERT_NONE
+        # Every event shares the same envelope; encode it once, up to the
+        # "event" value, so each span is serialized straight into the payload
+        envelope = _json_dumpb({"index": index, "sourcetype": sourcetype, "source": "genai-telemetry"})
+        self._event_prefix = envelope[:-1] + b',"event":'
+        self._headers = {
+            "Authorization": f"Splunk {hec_token}",
+            "Content-Type": "application/json"
+        }
+        self._gzip_headers = {**self._headers, "Content-Encoding": "gzip"}
         
-        self._batch: List[dict] = []
-        self._lock = threading.Lock()
-        self._flush_thread: Optional[threading.Thread] = None
+        self.ssl_context = default_ssl_context(verify_ssl)
+        
+        # deque append/popleft are atomic, so producers never take a lock
+        self._batch: Deque[dict] = collections.deque()
+        self._http = HTTPConnectionPool(ssl_context=self.ssl_context, maxsize=max_connections)
+        self._flush_handle: Optional[int] = None
         self._running = False
+        # Sends the requests of a split batch concurrently; created on first use
+        self.max_connections = max_connections
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._pool_stopped = False
         
-        atexit.register(self.stop)
+        _SCHEDULER.at_exit(self.stop)
     
     def start(self) -> None:
-        """Start the exporter and background flush thread."""
+        """Start the exporter and schedule periodic flushes."""
         if self._running:
             return
         self._running = True
+        with self._pool_lock:
+            self._pool_stopped = False
         if self.batch_size > 1:
-            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-            self._flush_thread.start()
+            self._flush_handle = _SCHEDULER.register(self.flush_interval, self.flush)
     
     def stop(self) -> None:
         """Stop the exporter and flush remaining data."""
         self._running = False
+        if self._flush_handle is not None:
+            _SCHEDULER.unregister(self._flush_handle)
+            self._flush_handle = None
         self.flush()
-    
-    def _flush_loop(self) -> None:
-        """Background thread for periodic flushing."""
-        while self._running:
-            time.sleep(self.flush_interval)
-            self.flush()
+        with self._pool_lock:
+            # Sends racing with or following stop() go out sequentially
+            # rather than starting a pool nothing would shut down
+            self._pool_stopped = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self._http.close()
     
     def flush(self) -> None:
         """Flush any buffered spans."""
-        with self._lock:
-            if not self._batch:
-                return
-            batch = self._batch.copy()
-            self._batch = []
-        self._send_batch(batch)
+        batch = []
+        popleft = self._batch.popleft
+        for _ in range(len(self._batch)):
+            try:
+                batch.append(popleft())
+            except IndexError:
+                break
+        if batch:
+            self._send_batch(batch)
     
     def _send_batch(self, batch: List[dict]) -> bool:
         """Send a batch of spans to Splunk HEC."""
         if not batch:
             return True
         
-        lines = []
-        for span in batch:
-            event = {
-                "index": self.index,
-                "sourcetype": self.sourcetype,
-                "source": "genai-telemetry",
-                "event": span
-            }
-            lines.append(json.dumps(event))
+        prefix = self._event_prefix
+        if len(batch) == 1:
+            return self._send(prefix + _json_dumpb(batch[0]) + b"}")
+        
+        max_bytes = self.max_batch_bytes
+        if max_bytes is None:
+            # Encoded while it is sent, so the whole body is never held in
+            # memory at once
+            return self._send(_EventStream(prefix, batch))
         
-        payload = "\n".join(lines)
-        return self._send(payload)
+        bodies = self._split_bodies(batch, max_bytes)
+        first = next(bodies)
+        second = next(bodies, None)
+        if second is None:
+            return self._send(first)
+        
+        # The requests of a split batch go out concurrently, at most
+        # max_connections at a time, so memory stays bounded by that many
+        # request bodies
+        ok = True
+        limit = max(1, self.max_connections)
+        in_flight: Deque[Future] = collections.deque()
+        for body in itertools.chain((first, second), bodies):
+            if len(in_flight) >= limit:
+                ok = in_flight.popleft().result() and ok
+            future = self._submit(body)
+            if future is None:
+                ok = self._send(body) and ok
+            else:
+                in_flight.append(future)
+        for future in in_flight:
+            ok = future.result() and ok
+        return ok
+    
+    def _split_bodies(self, batch: List[dict], max_bytes: int) -> Iterator[bytes]:
+        """Yield newline-delimited event bodies of at most max_bytes each."""
+        prefix = self._event_prefix
+        body = bytearray()
+        for span in batch:
+            event = prefix + _json_dumpb(span) + b"}"
+            if body and len(body) + 1 + len(event) > max_bytes:
+                yield bytes(body)
+                body.clear()
+            if body:
+                body += b"\n"
+            body += event
+        if body:
+            yield bytes(body)
+    
+    def _submit(self, body: bytes) -> Optional[Future]:
+        """Send a body on the worker pool; None if the pool refuses work."""
+        with self._pool_lock:
+            if self._pool_stopped:
+                return None
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_connections), thread_name_prefix="genai-telemetry-splunk"
+                )
+            try:
+                return self._pool.submit(self._send, body)
+            except RuntimeError:
+                # The pool refuses new work during interpreter shutdown
+                return None
     
-    def _send(self, payload: str) -> bool:
+    def _send(self, data: Union[bytes, Iterable[bytes]]) -> bool:
         """Send payload to Splunk HEC."""
-        data = payload.encode("utf-8")
-        req = urllib.request.Request(
-            self.hec_url,
-            data=data,
-            headers={
-                "Authorization": f"Splunk {self.hec_token}",
-                "Content-Type": "application/json"
-            },
-            method="POST"
-        )
+        headers = self._headers
+        if self.compress:
+            if isinstance(data, bytes):
+                data, headers = gzip_body(data, headers, gzip_headers=self._gzip_headers)
+            else:
+                data, headers = GzipStream(data), self._gzip_headers
         
         try:
-            with urllib.request.urlopen(req, context=self.ssl_context, timeout=10) as resp:
-                return resp.status == 200
+            status = self._http.request("POST", self.hec_url, body=data, headers=headers)
+            return status == 200
         except Exception as e:
             logger.error(f"Splunk HEC Error: {e}")
             return False
     
     def export(self, span_data: Dict[str, Any]) -> bool:
         """Export a single span."""
+        return self.export_batch([span_data])
+    
+    def export_batch(self, spans: List[Dict[str, Any]]) -> bool:
+        """Export spans, sending them in one request when not batching."""
         if self.batch_size <= 1:
-            return self._send_batch([span_data])
-        
-        with self._lock:
-            self._batch.append(span_data)
-            should_flush = len(self._batch) >= self.batch_size
+            return self._send_batch(spans) if spans else True
         
-        if should_flush:
-            self.flush()
+        self._batch.extend(spans)
+        if len(self._batch) >= self.batch_size:
+            # Hand the send to the flush thread when running, so the traced
+            # call doesn't block on HEC
+            if self._flush_handle is not None:
+                _SCHEDULER.trigger(self._flush_handle)
+            else:
+                self.flush()
         return True
     
     def health_check(self) -> bool:
@@ -87,6 +87,26 @@ class TestTokenExtraction:
         assert input_tokens == 0
         assert output_tokens == 0
     
+    def test_extract_tokens_usage_path_cached_per_type(self):
+        """Test the matched usage path is reused and re-probed when it stops matching."""
+        from genai_telemetry.core.utils import _TOKEN_EXTRACTORS
+        
+        class Usage:
+            def __init__(self, **tokens):
+                self.__dict__.update(tokens)
+        
+        class Response:
+            def __init__(self, usage):
+                self.usage = usage
+        
+        openai_style = Response(Usage(prompt_tokens=10, completion_tokens=5))
+        assert extract_tokens_from_response(openai_style) == (10, 5)
+        assert Response in _TOKEN_EXTRACTORS
+        
+        assert extract_tokens_from_response(Response(Usage(prompt_tokens=3, completion_tokens=2))) == (3, 2)
+        assert extract_tokens_from_response(Response(Usage(input_tokens=7, output_tokens=1))) == (7, 1)
+        assert extract_tokens_from_response(Response(None)) == (0, 0)
+    
     def test_extract_tokens_string_response(self):
         """Test token extraction from string response."""
         input_tokens, output_tokens = extract_tokens_from_response("Hello world")
@@ -113,6 +133,31 @@ class TestContentExtraction:
         
         assert content == "Generated text"
     
+    def test_extract_content_reprobes_when_cached_path_misses(self):
+        """Test a cached access path is not reused for a differently shaped response."""
+        from types import SimpleNamespace
+        
+        chat = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="chat"))])
+        blocks = SimpleNamespace(content=[SimpleNamespace(text="a"), SimpleNamespace(text="b")])
+        
+        assert extract_content_from_response(chat) == "chat"
+        assert extract_content_from_response(blocks) == "ab"
+        assert extract_content_from_response(chat) == "chat"
+    
+    def test_extract_content_same_type_switches_between_str_and_blocks(self):
+        """Test one type whose content is sometimes blocks and sometimes a string."""
+        class Block:
+            def __init__(self, text):
+                self.text = text
+        
+        class Msg:
+            def __init__(self, content):
+                self.content = content
+        
+        assert extract_content_from_response(Msg([Block("hi")])) == "hi"
+        assert extract_content_from_response(Msg("plain string answer")) == "plain string answer"
+        assert extract_content_from_response(Msg([Block("a"), Block("b")])) == "ab"
+    
     def test_extract_content_dict_openai_style(self):
         """Test content extraction from dict (OpenAI style)."""
         response = {
@@ -197,6 +242,15 @@ class TestSpan:
         assert span.duration_ms > 0
         assert span.end_time is not None
     
+    def test_span_duration_ignores_wall_clock_jumps(self):
+        """Test span duration uses the monotonic clock, not time.time()."""
+        span = Span(trace_id="trace123", span_id="span456", name="timed_span", span_type="LLM")
+        
+        with patch("time.time", return_value=span.start_time - 3600):
+            span.finish()
+        
+        assert 0 <= span.duration_ms < 1000
+    
     def test_span_to_dict(self):
         """Test span serialization to dict."""
         span = Span(
@@ -220,6 +274,16 @@ class TestSpan:
         assert data["status"] == "OK"
         assert "timestamp" in data
         assert "duration_ms" in data
+    
+    def test_span_custom_data_goes_in_attributes(self):
+        """Test spans use slots and carry custom data in attributes."""
+        span = Span(trace_id="t", span_id="s", name="n", span_type="TOOL")
+        span.set_attribute("region", "eu")
+        
+        assert not hasattr(span, "__dict__")
+        with pytest.raises(AttributeError):
+            span.region = "eu"
+        assert span.to_dict()["region"] == "eu"
 
 
 class TestConsoleExporter:
@@ -262,6 +326,53 @@ class TestSetupTelemetry:
         assert telemetry is not None
         assert telemetry.workflow_name == "test_app"
     
+    def test_setup_console_uses_console_exporter_directly(self):
+        """Test console setup is not wrapped in a MultiExporter."""
+        telemetry = setup_telemetry(workflow_name="test_app", exporter="console")
+        
+        assert isinstance(telemetry.exporter, ConsoleExporter)
+    
+    def test_setup_file_flag_not_duplicated(self, tmp_path):
+        """Test file_path does not add a second FileExporter."""
+        file_path = str(tmp_path / "traces.jsonl")
+        telemetry = setup_telemetry(
+            workflow_name="test_app",
+            exporter="file",
+            file_path=file_path,
+            console=True
+        )
+        
+        names = [type(e).__name__ for e in telemetry.exporter.exporters]
+        assert names == ["FileExporter", "ConsoleExporter"]
+    
+    def test_create_exporter_resolves_aliases(self):
+        """Test exporter type aliases map to the canonical exporter."""
+        from genai_telemetry.core.telemetry import _create_exporter
+        from genai_telemetry.exporters.elasticsearch import ElasticsearchExporter
+        from genai_telemetry.exporters.otlp import OTLPExporter
+        
+        assert isinstance(_create_exporter("ES", {}), ElasticsearchExporter)
+        assert isinstance(_create_exporter("otel", {}), OTLPExporter)
+    
+    def test_setup_with_exporter_instance(self):
+        """Test setup with an exporter instance uses it as-is."""
+        exporter = ConsoleExporter(colored=False)
+        
+        telemetry = setup_telemetry(workflow_name="test_app", exporter=exporter)
+        
+        assert telemetry.exporter is exporter
+    
+    def test_setup_console_subclass_not_duplicated(self):
+        """Test a ConsoleExporter subclass counts as the requested console exporter."""
+        class QuietConsole(ConsoleExporter):
+            pass
+        
+        exporter = QuietConsole(colored=False)
+        
+        telemetry = setup_telemetry(workflow_name="test_app", exporter=exporter, console=True)
+        
+        assert telemetry.exporter is exporter
+    
     def test_setup_invalid_exporter_raises(self):
         """Test that invalid exporter raises ValueError."""
         with pytest.raises(ValueError):
@@ -279,6 +390,53 @@ class TestSetupTelemetry:
         assert telemetry is not None
         assert telemetry.workflow_name == "test_app"
 
+    
+    def test_get_telemetry_is_isolated_per_context(self):
+        """Test setup in a copied context does not replace the caller's instance."""
+        import contextvars
+        
+        outer = setup_telemetry(workflow_name="outer_app", exporter="console")
+        ctx = contextvars.copy_context()
+        inner = ctx.run(setup_telemetry, workflow_name="inner_app", exporter="console")
+        
+        assert get_telemetry() is outer
+        assert ctx.run(get_telemetry) is inner
+    
+    def test_get_telemetry_from_new_thread(self):
+        """Test threads without their own setup see the latest instance."""
+        import threading
+        
+        telemetry = setup_telemetry(workflow_name="test_app", exporter="console")
+        result = []
+        thread = threading.Thread(target=lambda: result.append(get_telemetry()))
+        thread.start()
+        thread.join()
+        
+        assert result == [telemetry]
+    
+    def test_generated_ids_are_hex(self):
+        """Test generated trace and span IDs have W3C lengths."""
+        telemetry = setup_telemetry(workflow_name="test_app", exporter="console")
+        
+        with telemetry.start_span("step", "TOOL") as span:
+            pass
+        
+        assert len(span.trace_id) == 32 and int(span.trace_id, 16) >= 0
+        assert len(span.span_id) == 16 and int(span.span_id, 16) >= 0
+    
+    def test_generated_ids_ignore_global_seed(self):
+        """Test seeding the global random module does not repeat IDs."""
+        import random
+        
+        telemetry = setup_telemetry(workflow_name="test_app", exporter="console")
+        
+        random.seed(42)
+        first = telemetry.new_trace()
+        random.seed(42)
+        second = telemetry.new_trace()
+        
+        assert first != second
+
 
 class TestDecorators:
     """Tests for trace decorators."""
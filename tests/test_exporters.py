@@ -1,15 +1,112 @@
 """Tests for telemetry exporters."""
 
+import gzip
+import io
 import json
+import socket
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
 
-from genai_telemetry.exporters.base import BaseExporter
-from genai_telemetry.exporters.console import ConsoleExporter
+from genai_telemetry.exporters.base import (
+    BaseExporter,
+    _FlushScheduler,
+    _json_dumpb,
+    _json_dumps_indent,
+    _split_by_size,
+)
+from genai_telemetry.exporters.console import ConsoleExporter, _color_template
 from genai_telemetry.exporters.file import FileExporter
 from genai_telemetry.exporters.multi import MultiExporter
-from genai_telemetry.exporters.splunk import SplunkHECExporter
-from genai_telemetry.exporters.elasticsearch import ElasticsearchExporter
+from genai_telemetry.exporters.splunk import STREAM_CHUNK_SIZE, SplunkHECExporter, _EventStream
+from genai_telemetry.exporters.elasticsearch import ElasticsearchExporter, _BulkStream
+from genai_telemetry.exporters.cloudwatch import CloudWatchExporter
+from genai_telemetry.exporters.loki import LokiExporter
+from genai_telemetry.exporters.datadog import DatadogExporter
+from genai_telemetry.exporters.otlp import OTLPExporter
+from genai_telemetry.exporters.prometheus import PrometheusExporter
+from genai_telemetry.exporters.http import HTTPConnectionPool, HTTPStatusError, default_ssl_context, gzip_body
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that records each request."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                chunk = self.rfile.read(size + 2)[:size]
+                if not size:
+                    break
+                body += chunk
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append({
+            "path": self.path,
+            "client": self.client_address,
+            "headers": dict(self.headers),
+            "body": body,
+        })
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    do_GET = do_POST
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """Local HTTP/1.1 server that records requests."""
+    # Threaded, so an idle keep-alive connection can't block shutdown
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.status = 200
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _decode_proto(data):
+    """Decode protobuf wire format into {field: [values]} (nested messages stay bytes)."""
+    fields, pos = {}, 0
+    
+    def varint():
+        nonlocal pos
+        result = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                return result
+    
+    while pos < len(data):
+        key = varint()
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value = varint()
+        elif wire_type == 1:
+            value, pos = bytes(data[pos:pos + 8]), pos + 8
+        else:
+            length = varint()
+            value, pos = bytes(data[pos:pos + length]), pos + length
+        fields.setdefault(field, []).append(value)
+    return fields
 
 
 class TestBaseExporter:
@@ -37,6 +134,250 @@ class TestBaseExporter:
         
         assert result is True
         assert len(exporter.exports) == 2
+    
+    def test_base_exporter_export_batch_continues_after_failure(self):
+        """Test default export_batch exports every span even if one fails."""
+        class TestExporter(BaseExporter):
+            def __init__(self):
+                self.exports = []
+            
+            def export(self, span_data):
+                self.exports.append(span_data)
+                return span_data["span_type"] != "LLM"
+        
+        exporter = TestExporter()
+        
+        result = exporter.export_batch([{"span_type": "LLM"}, {"span_type": "TOOL"}])
+        
+        assert result is False
+        assert len(exporter.exports) == 2
+    
+    def test_base_exporter_export_span_default(self):
+        """Test default export_span converts the Span and calls export()."""
+        class TestExporter(BaseExporter):
+            def __init__(self):
+                self.exports = []
+            
+            def export(self, span_data):
+                self.exports.append(span_data)
+                return True
+        
+        span = MagicMock()
+        span.to_dict.return_value = {"span_type": "LLM"}
+        exporter = TestExporter()
+        
+        assert exporter.export_span(span) is True
+        assert exporter.exports == [{"span_type": "LLM"}]
+
+
+class TestJsonHelpers:
+    """Tests for the shared JSON serialization helpers."""
+    
+    def test_json_dumpb_is_compact(self):
+        """Test output is compact UTF-8 JSON bytes."""
+        assert _json_dumpb({"a": 1, "b": [1, 2]}) == b'{"a":1,"b":[1,2]}'
+    
+    def test_json_dumpb_without_orjson(self):
+        """Test the stdlib fallback produces the same output."""
+        with patch("genai_telemetry.exporters.base.orjson", None):
+            assert _json_dumpb({"a": 1, "b": [1, 2]}) == b'{"a":1,"b":[1,2]}'
+    
+    def test_json_dumps_indent_matches_stdlib(self):
+        """Test indented output matches json.dumps(indent=2) with or without orjson."""
+        data = {"a": 1, "b": [1, 2], "c": {"d": "e"}}
+        
+        assert _json_dumps_indent(data) == json.dumps(data, indent=2)
+        with patch("genai_telemetry.exporters.base.orjson", None):
+            assert _json_dumps_indent(data) == json.dumps(data, indent=2)
+    
+    def test_split_by_size_respects_both_limits(self):
+        """Test chunks are bounded by item count and total size."""
+        items = ["a", "b", "c", "d", "e"]
+        sizes = [4, 4, 4, 1, 1]
+        
+        chunks = list(_split_by_size(items, sizes, max_items=3, max_bytes=8))
+        
+        assert chunks == [["a", "b"], ["c", "d", "e"]]
+
+
+class TestHTTPConnectionPool:
+    """Tests for the keep-alive connection pool."""
+    
+    def test_connection_is_reused(self, http_server):
+        """Test consecutive requests share one TCP connection."""
+        pool = HTTPConnectionPool()
+        
+        assert pool.request("POST", f"{http_server.url}/a", body=b"1") == 200
+        assert pool.request("POST", f"{http_server.url}/b", body=b"2") == 200
+        pool.close()
+        
+        clients = [r["client"] for r in http_server.requests]
+        assert [r["path"] for r in http_server.requests] == ["/a", "/b"]
+        assert clients[0] == clients[1]
+    
+    def test_error_status_raises(self, http_server):
+        """Test 4xx/5xx responses raise HTTPStatusError."""
+        http_server.status = 500
+        pool = HTTPConnectionPool()
+        
+        with pytest.raises(HTTPStatusError) as exc_info:
+            pool.request("POST", f"{http_server.url}/fail", body=b"x")
+        pool.close()
+        
+        assert exc_info.value.status == 500
+    
+    def test_new_connections_reuse_cached_dns(self, http_server):
+        """Test the host is resolved once for several new connections."""
+        port = http_server.server_address[1]
+        pool = HTTPConnectionPool(maxsize=0)
+        
+        with patch("socket.getaddrinfo", wraps=socket.getaddrinfo) as getaddrinfo:
+            for _ in range(3):
+                pool.request("POST", f"http://localhost:{port}/a", body=b"1")
+        pool.close()
+        
+        lookups = [c for c in getaddrinfo.call_args_list if c.args[0] == "localhost"]
+        assert len(http_server.requests) == 3
+        assert len(lookups) == 1
+    
+    def test_gzip_body_skips_small_payloads(self):
+        """Test only bodies above the threshold are compressed."""
+        headers = {"Content-Type": "application/json"}
+        
+        small, small_headers = gzip_body(b"{}", headers)
+        large, large_headers = gzip_body(b"x" * 1024, headers)
+        
+        assert small == b"{}" and "Content-Encoding" not in small_headers
+        assert gzip.decompress(large) == b"x" * 1024
+        assert large_headers["Content-Encoding"] == "gzip"
+        assert "Content-Encoding" not in headers
+
+    
+    def test_ssl_context_is_shared(self):
+        """Test exporters share one SSL context per verification setting."""
+        import ssl
+        
+        verifying = OTLPExporter(verify_ssl=True).ssl_context
+        insecure = SplunkHECExporter(hec_url="https://splunk:8088", hec_token="t").ssl_context
+        
+        assert verifying is default_ssl_context(True) is HTTPConnectionPool().ssl_context
+        assert insecure is default_ssl_context(False)
+        assert insecure.verify_mode == ssl.CERT_NONE and not insecure.check_hostname
+        assert verifying.verify_mode == ssl.CERT_REQUIRED
+    
+    def test_http_proxy_from_environment(self, http_server):
+        """Test HTTP_PROXY routes requests through the proxy with an absolute URL."""
+        env = {"http_proxy": http_server.url, "no_proxy": ""}
+        with patch.dict("os.environ", env, clear=True):
+            pool = HTTPConnectionPool()
+        
+        assert pool.request("POST", "http://collector.example:4318/v1/traces", body=b"{}") == 200
+        pool.close()
+        
+        assert http_server.requests[0]["path"] == "http://collector.example:4318/v1/traces"
+        assert http_server.requests[0]["headers"]["Host"] == "collector.example:4318"
+    
+    def test_no_proxy_bypasses_proxy(self):
+        """Test hosts listed in NO_PROXY are connected to directly."""
+        env = {"http_proxy": "http://proxy:3128", "https_proxy": "http://user:pw@proxy:3128", "no_proxy": "internal"}
+        with patch.dict("os.environ", env, clear=True):
+            pool = HTTPConnectionPool()
+            
+            assert pool._proxy_for("http", "internal:8080") is None
+            assert pool._proxy_for("http", "example.com") == ("proxy:3128", {})
+            netloc, auth = pool._proxy_for("https", "example.com")
+        
+        assert netloc == "proxy:3128"
+        assert auth["Proxy-Authorization"] == "Basic dXNlcjpwdw=="
+    
+    def test_https_proxy_uses_tunnel(self):
+        """Test HTTPS requests through a proxy open a CONNECT tunnel to the target."""
+        with patch.dict("os.environ", {"https_proxy": "http://proxy:3128"}, clear=True):
+            pool = HTTPConnectionPool()
+        
+        conn = pool._new_connection("https", "example.com:8443")
+        
+        assert (conn.host, conn.port) == ("proxy", 3128)
+        assert (conn._tunnel_host, conn._tunnel_port) == ("example.com", 8443)
+
+class TestFlushScheduler:
+    """Tests for the shared flush scheduler."""
+    
+    def test_register_runs_callback_periodically(self):
+        """Test registered callbacks run on the shared thread."""
+        scheduler = _FlushScheduler()
+        calls = []
+        done = threading.Event()
+        
+        def callback():
+            calls.append(1)
+            if len(calls) >= 2:
+                done.set()
+        
+        handle = scheduler.register(0.01, callback)
+        
+        assert done.wait(2)
+        scheduler.unregister(handle)
+    
+    def test_unregister_stops_callback(self):
+        """Test unregistered callbacks are no longer invoked."""
+        scheduler = _FlushScheduler()
+        callback = MagicMock()
+        
+        handle = scheduler.register(0.05, callback)
+        scheduler.unregister(handle)
+        threading.Event().wait(0.15)
+        
+        callback.assert_not_called()
+    
+    def test_trigger_runs_callback_immediately(self):
+        """Test trigger() runs a callback without waiting for its interval."""
+        scheduler = _FlushScheduler()
+        done = threading.Event()
+        
+        handle = scheduler.register(60, done.set)
+        scheduler.trigger(handle)
+        
+        assert done.wait(2)
+        scheduler.unregister(handle)
+    
+    def test_slow_callback_does_not_block_others(self):
+        """Test a callback still runs while another one is blocked."""
+        scheduler = _FlushScheduler()
+        release = threading.Event()
+        started = threading.Event()
+        done = threading.Event()
+        
+        def slow():
+            started.set()
+            release.wait(5)
+        
+        slow_handle = scheduler.register(60, slow)
+        fast_handle = scheduler.register(60, done.set)
+        scheduler.trigger(slow_handle)
+        assert started.wait(2)
+        scheduler.trigger(fast_handle)
+        
+        assert done.wait(2)
+        release.set()
+        scheduler.unregister(slow_handle)
+        scheduler.unregister(fast_handle)
+    
+    def test_exporters_share_one_thread(self):
+        """Test batching exporters do not spawn their own flush threads."""
+        before = threading.active_count()
+        exporters = [
+            SplunkHECExporter(hec_url="http://splunk:8088", hec_token="t", batch_size=10),
+            ElasticsearchExporter(hosts=["http://es:9200"], batch_size=10),
+        ]
+        for exp in exporters:
+            exp.start()
+        
+        assert threading.active_count() <= before + 1
+        
+        for exp in exporters:
+            exp._batch.clear()
+            exp.stop()
 
 
 class TestConsoleExporter:
@@ -123,15 +464,71 @@ class TestConsoleExporter:
         
         captured = capsys.readouterr()
         assert "ERROR" in captured.out
+    
+    def test_colored_error_span_uses_cached_template(self, capsys):
+        """Test that colored templates are built once per span type and status."""
+        exporter = ConsoleExporter(colored=True)
+        span_data = {"span_type": "TOOL", "name": "search", "status": "ERROR"}
+        
+        _color_template.cache_clear()
+        exporter.export(span_data)
+        exporter.export(span_data)
+        
+        captured = capsys.readouterr()
+        assert "\033[93m[TOOL" in captured.out
+        assert "\033[91mERROR" in captured.out
+        info = _color_template.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+    
+    def test_export_span_reads_slots(self, capsys):
+        """Test that export_span prints the same line as export(to_dict())."""
+        from genai_telemetry.core.span import Span
+        
+        exporter = ConsoleExporter(colored=True)
+        span = Span("t", "s", "chat", "LLM", model_name="gpt-4o", input_tokens=10, output_tokens=5)
+        span.finish()
+        
+        exporter.export(span.to_dict())
+        expected = capsys.readouterr().out
+        with patch.object(Span, "to_dict", side_effect=AssertionError):
+            assert exporter.export_span(span) is True
+        
+        assert capsys.readouterr().out == expected
+    
+    def test_export_is_single_buffer_write(self):
+        """Test that the line and verbose JSON go out in one binary write."""
+        exporter = ConsoleExporter(colored=False, verbose=True)
+        stdout = MagicMock(encoding="utf-8", errors="strict")
+        
+        with patch.object(sys, "stdout", stdout):
+            exporter.export({"span_type": "LLM", "name": "chat"})
+        
+        stdout.buffer.write.assert_called_once()
+        stdout.write.assert_not_called()
+        blob = stdout.buffer.write.call_args[0][0]
+        assert isinstance(blob, bytes)
+        assert blob.startswith(b"[LLM         ] chat")
+        assert b'"span_type": "LLM"' in blob
+        assert blob.endswith(b"\n")
+    
+    def test_export_to_text_only_stream(self):
+        """Test that streams without a binary buffer get text."""
+        exporter = ConsoleExporter(colored=False)
+        stdout = io.StringIO()
+        
+        with patch.object(sys, "stdout", stdout):
+            exporter.export({"span_type": "LLM", "name": "chat"})
+        
+        assert stdout.getvalue().startswith("[LLM         ] chat")
 
 
 class TestFileExporter:
     """Tests for file exporter."""
     
-    def test_export_writes_jsonl(self, tmp_path):
+    def test_export_writes_jsonl(self):
         """Test that export writes JSONL format."""
-        file_path = tmp_path / "traces.jsonl"
-        exporter = FileExporter(file_path=str(file_path))
+        sink = io.BytesIO()
+        exporter = FileExporter(file_path="unused.jsonl", sink=sink)
         
         span_data = {
             "span_type": "LLM",
@@ -140,26 +537,106 @@ class TestFileExporter:
         }
         
         result = exporter.export(span_data)
+        exporter.flush()
         
         assert result is True
         
-        with open(file_path) as f:
-            line = f.readline()
-            parsed = json.loads(line)
-            assert parsed["span_type"] == "LLM"
-            assert parsed["name"] == "chat"
+        parsed = json.loads(sink.getvalue().splitlines()[0])
+        assert parsed["span_type"] == "LLM"
+        assert parsed["name"] == "chat"
     
-    def test_export_multiple_spans(self, tmp_path):
+    def test_export_multiple_spans(self):
         """Test multiple span exports."""
-        file_path = tmp_path / "traces.jsonl"
-        exporter = FileExporter(file_path=str(file_path))
+        sink = io.BytesIO()
+        exporter = FileExporter(file_path="unused.jsonl", sink=sink)
         
         for i in range(3):
             exporter.export({"span_type": "LLM", "name": f"span_{i}"})
+        exporter.flush()
+        
+        assert len(sink.getvalue().splitlines()) == 3
+    
+    def test_sink_is_not_rotated_or_closed(self, tmp_path):
+        """Test that an injected sink is written in place of the file."""
+        sink = io.BytesIO()
+        exporter = FileExporter(file_path=str(tmp_path / "traces.jsonl"), rotate_size_mb=0, sink=sink)
+        
+        exporter.export({"span_type": "LLM"})
+        exporter.export({"span_type": "TOOL"})
+        exporter.stop()
+        
+        assert not sink.closed
+        assert list(tmp_path.iterdir()) == []
+        assert [json.loads(line)["span_type"] for line in sink.getvalue().splitlines()] == ["LLM", "TOOL"]
+    
+    def test_export_keeps_file_open(self, tmp_path):
+        """Test that the file is opened once, not per span."""
+        file_path = tmp_path / "traces.jsonl"
+        exporter = FileExporter(file_path=str(file_path))
+        
+        with patch("builtins.open", wraps=open) as mock_file:
+            for i in range(5):
+                exporter.export({"span_type": "LLM", "name": f"span_{i}"})
+        exporter.stop()
+        
+        assert mock_file.call_count == 1
+        assert len(file_path.read_text().splitlines()) == 5
+    
+    def test_rotation_uses_tracked_size(self, tmp_path):
+        """Test that the file rotates once the written bytes cross the limit."""
+        file_path = tmp_path / "traces.jsonl"
+        file_path.write_bytes(b"x" * 100)
+        exporter = FileExporter(file_path=str(file_path), rotate_size_mb=0)
+        
+        exporter.export({"span_type": "LLM"})
+        exporter.stop()
+        
+        rotated = [p for p in tmp_path.iterdir() if p.name != "traces.jsonl"]
+        assert len(rotated) == 1
+        assert rotated[0].read_bytes() == b"x" * 100
+        assert json.loads(file_path.read_text())["span_type"] == "LLM"
+    
+    def test_export_batch_single_write(self, tmp_path):
+        """Test that export_batch writes all lines with one write call."""
+        file_path = tmp_path / "traces.jsonl"
+        exporter = FileExporter(file_path=str(file_path))
+        
+        with patch.object(exporter, "_write", wraps=exporter._write) as write:
+            assert exporter.export_batch([{"seq": i} for i in range(5)]) is True
+        exporter.stop()
         
-        with open(file_path) as f:
-            lines = f.readlines()
-            assert len(lines) == 3
+        write.assert_called_once()
+        lines = file_path.read_text().splitlines()
+        assert [json.loads(line)["seq"] for line in lines] == list(range(5))
+    
+    def test_async_writes_drain_on_flush(self, tmp_path):
+        """Test that queued spans are on disk once flush() returns."""
+        file_path = tmp_path / "traces.jsonl"
+        exporter = FileExporter(file_path=str(file_path), async_write=True)
+        exporter.start()
+        
+        try:
+            for i in range(100):
+                assert exporter.export({"span_type": "LLM", "seq": i}) is True
+            exporter.flush()
+            
+            lines = file_path.read_text().splitlines()
+            assert [json.loads(line)["seq"] for line in lines] == list(range(100))
+        finally:
+            exporter.stop()
+    
+    def test_async_writer_stops_and_closes(self, tmp_path):
+        """Test that stop() drains the queue and joins the writer thread."""
+        file_path = tmp_path / "traces.jsonl"
+        exporter = FileExporter(file_path=str(file_path), async_write=True)
+        
+        exporter.export({"span_type": "LLM"})
+        writer = exporter._writer
+        exporter.stop()
+        
+        assert not writer.is_alive()
+        assert exporter._fh is None
+        assert json.loads(file_path.read_text())["span_type"] == "LLM"
 
 
 class TestMultiExporter:
@@ -179,8 +656,10 @@ class TestMultiExporter:
         result = multi.export(span_data)
         
         assert result is True
-        mock_exporter1.export.assert_called_once_with(span_data)
-        mock_exporter2.export.assert_called_once_with(span_data)
+        mock_exporter1.export.assert_called_once()
+        assert mock_exporter1.export.call_args.args[0] is span_data
+        mock_exporter2.export.assert_called_once()
+        assert mock_exporter2.export.call_args.args[0] is span_data
     
     def test_export_succeeds_if_one_succeeds(self):
         """Test that export succeeds if at least one exporter succeeds."""
@@ -196,6 +675,103 @@ class TestMultiExporter:
         
         assert result is True
     
+    def test_export_runs_exporters_concurrently(self):
+        """Test that a slow exporter does not delay the others."""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        class BarrierExporter(BaseExporter):
+            def export(self, span_data):
+                barrier.wait()
+                return True
+        
+        multi = MultiExporter([BarrierExporter(), BarrierExporter()])
+        
+        # Both exports must be in flight at once for the barrier to release
+        assert multi.export({"span_type": "LLM"}) is True
+        multi.stop()
+    
+    def test_export_batch_forwards_batches(self):
+        """Test that export_batch hands each exporter the whole batch."""
+        mock_exporter1 = MagicMock()
+        mock_exporter1.export_batch.return_value = True
+        mock_exporter2 = MagicMock()
+        mock_exporter2.export_batch.return_value = False
+        multi = MultiExporter([mock_exporter1, mock_exporter2])
+        spans = [{"span_type": "LLM"}, {"span_type": "TOOL"}]
+        
+        assert multi.export_batch(spans) is True
+        
+        mock_exporter1.export_batch.assert_called_once()
+        assert mock_exporter1.export_batch.call_args.args[0] is spans
+        mock_exporter2.export_batch.assert_called_once()
+        assert mock_exporter2.export_batch.call_args.args[0] is spans
+        mock_exporter1.export.assert_not_called()
+    
+    def test_export_after_pool_shutdown_runs_inline(self):
+        """Test that export falls back to this thread once the pool refuses work."""
+        mock_exporter1 = MagicMock()
+        mock_exporter1.export.return_value = True
+        mock_exporter2 = MagicMock()
+        mock_exporter2.export.return_value = True
+        multi = MultiExporter([mock_exporter1, mock_exporter2])
+        multi._pool.shutdown(wait=True)
+        span_data = {"span_type": "LLM"}
+        
+        assert multi.export(span_data) is True
+        
+        mock_exporter1.export.assert_called_once()
+        mock_exporter2.export.assert_called_once()
+    
+    def test_flush_and_stop_run_exporters_concurrently(self):
+        """Test a slow flush does not delay the other exporters' flushes."""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        class BarrierExporter(BaseExporter):
+            def __init__(self):
+                self.flushed = 0
+            
+            def export(self, span_data):
+                return True
+            
+            def flush(self):
+                barrier.wait()
+                self.flushed += 1
+            
+            stop = flush
+        
+        exporters = [BarrierExporter(), BarrierExporter()]
+        multi = MultiExporter(exporters)
+        
+        multi.flush()
+        multi.stop()
+        
+        assert [exp.flushed for exp in exporters] == [2, 2]
+    
+    def test_flush_error_does_not_skip_other_exporters(self):
+        """Test one exporter failing to flush doesn't stop the rest."""
+        failing = MagicMock()
+        failing.flush.side_effect = RuntimeError("boom")
+        healthy = MagicMock()
+        
+        multi = MultiExporter([failing, healthy])
+        multi.flush()
+        multi.stop()
+        
+        healthy.flush.assert_called_once()
+    
+    def test_export_after_stop_runs_sequentially(self):
+        """Test that exporting still works once the worker pool is shut down."""
+        mock_exporter1 = MagicMock()
+        mock_exporter1.export.return_value = True
+        mock_exporter2 = MagicMock()
+        mock_exporter2.export.return_value = False
+        
+        multi = MultiExporter([mock_exporter1, mock_exporter2])
+        multi.stop()
+        
+        assert multi.export({"span_type": "LLM"}) is True
+        mock_exporter2.export.assert_called_once()
+    
     def test_start_calls_all_exporters(self):
         """Test start() calls all exporters."""
         mock_exporter1 = MagicMock()
@@ -251,45 +827,263 @@ class TestSplunkHECExporter:
         
         assert exporter.hec_url.endswith("/services/collector/event")
     
-    @patch('urllib.request.urlopen')
-    def test_export_single_span(self, mock_urlopen):
+    def test_export_single_span(self, http_server):
         """Test single span export."""
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.__enter__ = MagicMock(return_value=mock_response)
-        mock_response.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_response
-        
         exporter = SplunkHECExporter(
-            hec_url="http://splunk:8088",
+            hec_url=http_server.url,
             hec_token="test-token",
             batch_size=1
         )
         
         result = exporter.export({"span_type": "LLM", "name": "test"})
+        exporter.stop()
         
         assert result is True
-        mock_urlopen.assert_called_once()
+        assert len(http_server.requests) == 1
+        assert http_server.requests[0]["path"] == "/services/collector/event"
+        assert http_server.requests[0]["headers"]["Authorization"] == "Splunk test-token"
+    
+    def test_send_batch_newline_delimited_events(self, http_server):
+        """Test a batch is sent as one HEC event per line."""
+        exporter = SplunkHECExporter(hec_url=http_server.url, hec_token="test-token")
+        
+        assert exporter._send_batch([{"name": "a"}, {"name": "b"}]) is True
+        exporter.stop()
+        
+        body = http_server.requests[0]["body"]
+        events = [json.loads(line) for line in body.split(b"\n")]
+        assert [e["event"]["name"] for e in events] == ["a", "b"]
+        assert events[0]["index"] == "genai_traces"
+        assert events[0]["source"] == "genai-telemetry"
+    
+    def test_batch_flushes_on_size(self, http_server):
+        """Test batch_size spans are sent together in a single HEC request."""
+        exporter = SplunkHECExporter(hec_url=http_server.url, hec_token="test-token", batch_size=5, compress=False)
+        
+        for i in range(5):
+            assert exporter.export({"name": f"span-{i}"}) is True
+        
+        assert len(http_server.requests) == 1
+        events = [json.loads(line) for line in http_server.requests[0]["body"].split(b"\n")]
+        assert [e["event"]["name"] for e in events] == [f"span-{i}" for i in range(5)]
+        exporter.stop()
+    
+    def test_batch_is_split_by_max_batch_bytes(self, http_server):
+        """Test a batch over max_batch_bytes is sent as several requests under the limit."""
+        exporter = SplunkHECExporter(hec_url=http_server.url, hec_token="test-token", max_batch_bytes=2000, compress=False)
+        batch = [{"name": f"span-{i}", "prompt": "x" * 400} for i in range(10)]
+        
+        assert exporter._send_batch(batch) is True
+        exporter.stop()
+        
+        bodies = [r["body"] for r in http_server.requests]
+        assert len(bodies) > 1
+        assert all(len(body) <= 2000 for body in bodies)
+        names = [json.loads(line)["event"]["name"] for body in bodies for line in body.split(b"\n")]
+        # Split requests are sent concurrently, so they may arrive in any order
+        assert sorted(names, key=lambda name: int(name[5:])) == [f"span-{i}" for i in range(10)]
+    
+    def test_split_requests_are_sent_concurrently(self):
+        """Test the requests of a split batch overlap, up to max_connections."""
+        exporter = SplunkHECExporter(
+            hec_url="http://splunk:8088", hec_token="t", max_batch_bytes=500, max_connections=2
+        )
+        lock = threading.Lock()
+        active = []
+        peak = []
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def send(body):
+            with lock:
+                active.append(body)
+                peak.append(len(active))
+            barrier.wait()
+            with lock:
+                active.remove(body)
+            return True
+        
+        exporter._send = send
+        batch = [{"name": f"span-{i}", "prompt": "x" * 300} for i in range(6)]
+        
+        assert exporter._send_batch(batch) is True
+        exporter.stop()
+        
+        assert len(peak) == 6
+        assert max(peak) == 2
+    
+    def test_split_requests_after_stop_are_sequential(self):
+        """Test sends after stop() don't create a new worker pool."""
+        exporter = SplunkHECExporter(hec_url="http://splunk:8088", hec_token="t", max_batch_bytes=500)
+        exporter._send = MagicMock(return_value=True)
+        exporter.stop()
+        batch = [{"name": f"span-{i}", "prompt": "x" * 300} for i in range(4)]
+        
+        assert exporter._send_batch(batch) is True
+        
+        assert exporter._send.call_count == 4
+        assert exporter._pool is None
+    
+    def test_max_connections_sizes_pool(self):
+        """Test max_connections bounds the idle keep-alive connections."""
+        exporter = SplunkHECExporter(hec_url="http://splunk:8088", hec_token="t", max_connections=8)
+        
+        assert exporter._http.maxsize == 8
+    
+    def test_large_batch_is_streamed_in_chunks(self, http_server):
+        """Test a batch is sent with chunked encoding without building the whole body."""
+        exporter = SplunkHECExporter(hec_url=http_server.url, hec_token="test-token", max_batch_bytes=None)
+        batch = [{"name": f"span-{i}", "prompt": "x" * 1000} for i in range(200)]
+        
+        stream = _EventStream(exporter._event_prefix, batch)
+        chunks = list(stream)
+        assert len(chunks) > 1
+        assert max(len(c) for c in chunks) < STREAM_CHUNK_SIZE + 2000
+        assert list(stream) == chunks  # re-iterable for retries
+        
+        assert exporter._send_batch(batch) is True
+        exporter.stop()
+        
+        request = http_server.requests[0]
+        assert request["headers"]["Transfer-Encoding"] == "chunked"
+        assert request["headers"]["Content-Encoding"] == "gzip"
+        events = [json.loads(line) for line in gzip.decompress(request["body"]).split(b"\n")]
+        assert [e["event"]["name"] for e in events] == [f"span-{i}" for i in range(200)]
+    
+    def test_export_sends_gzip(self, http_server):
+        """Test large bodies are gzipped with the prebuilt Content-Encoding header."""
+        exporter = SplunkHECExporter(hec_url=http_server.url, hec_token="test-token")
+        batch = [{"name": f"span-{i}", "prompt": "x" * 100} for i in range(10)]
+        
+        assert exporter._send_batch([{"name": "small"}]) is True
+        assert exporter._send_batch(batch) is True
+        exporter.stop()
+        
+        small, large = http_server.requests
+        assert "Content-Encoding" not in small["headers"]
+        assert large["headers"]["Content-Encoding"] == "gzip"
+        assert large["headers"]["Authorization"] == "Splunk test-token"
+        events = [json.loads(line) for line in gzip.decompress(large["body"]).split(b"\n")]
+        assert [e["event"]["name"] for e in events] == [f"span-{i}" for i in range(10)]
+    
+    def test_batches_reuse_connection(self, http_server):
+        """Test consecutive sends share one keep-alive connection."""
+        exporter = SplunkHECExporter(hec_url=http_server.url, hec_token="test-token", batch_size=1)
+        
+        assert exporter.export({"name": "a"}) is True
+        assert exporter.export({"name": "b"}) is True
+        exporter.stop()
+        
+        clients = [r["client"] for r in http_server.requests]
+        assert len(clients) == 2 and clients[0] == clients[1]
 
 
 class TestElasticsearchExporter:
     """Tests for Elasticsearch exporter."""
     
-    def test_host_round_robin(self):
-        """Test host selection rotates."""
+    def test_host_is_sticky(self):
+        """Test the same healthy host is used for every request."""
         exporter = ElasticsearchExporter(
             hosts=["http://es1:9200", "http://es2:9200", "http://es3:9200"]
         )
         
-        host1 = exporter._get_host()
-        host2 = exporter._get_host()
-        host3 = exporter._get_host()
-        host4 = exporter._get_host()
+        hosts = [exporter._get_host() for _ in range(4)]
+        
+        assert hosts == ["http://es1:9200"] * 4
+    
+    def test_host_failover_skips_failed(self):
+        """Test a failing host is skipped until its backoff expires."""
+        exporter = ElasticsearchExporter(hosts=["http://es1:9200", "http://es2:9200"], compress=False)
+        exporter._http = MagicMock()
+        exporter._http.request.side_effect = [ConnectionRefusedError(), 200, 200]
+        
+        assert exporter._send(b"{}") is False
+        assert exporter._send(b"{}") is True
+        assert exporter._send(b"{}") is True
+        
+        urls = [c.args[1] for c in exporter._http.request.call_args_list]
+        assert urls == ["http://es1:9200", "http://es2:9200", "http://es2:9200"]
+        
+        # Once es2 fails too, es1 is back out of backoff and takes over
+        exporter._host_retry_at["http://es1:9200"] = 0.0
+        exporter._http.request.side_effect = [HTTPStatusError("u", 503, "Unavailable"), 200]
+        assert exporter._send(b"{}") is False
+        assert exporter._send(b"{}") is True
+        assert exporter._http.request.call_args.args[1] == "http://es1:9200"
+    
+    def test_client_error_keeps_host(self):
+        """Test a 4xx response doesn't fail the host over."""
+        exporter = ElasticsearchExporter(hosts=["http://es1:9200", "http://es2:9200"], compress=False)
+        exporter._http = MagicMock()
+        exporter._http.request.side_effect = HTTPStatusError("u", 400, "Bad Request")
+        
+        assert exporter._send(b"{}") is False
+        
+        assert exporter._get_host() == "http://es1:9200"
+    
+    def test_export_batch_sends_one_bulk_request(self):
+        """Test that export_batch sends all spans in one bulk request."""
+        exporter = ElasticsearchExporter(hosts=["http://es:9200"])
+        spans = [{"name": "a", "timestamp": "t"}, {"name": "b", "@timestamp": "u"}]
+        
+        with patch.object(exporter, "_send_batch", return_value=True) as send_batch:
+            assert exporter.export_batch(spans) is True
+        
+        send_batch.assert_called_once()
+        sent = send_batch.call_args[0][0]
+        assert [span["@timestamp"] for span in sent] == ["t", "u"]
+        assert "@timestamp" not in spans[0]
+    
+    def test_send_batch_bulk_body(self, http_server):
+        """Test the bulk body alternates action and document lines."""
+        exporter = ElasticsearchExporter(hosts=[http_server.url], index="traces", compress=False)
+        
+        assert exporter._send_batch([{"name": "a"}, {"name": "b"}]) is True
+        exporter.stop()
+        
+        request = http_server.requests[0]
+        assert request["path"] == "/_bulk"
+        lines = request["body"].decode().split("\n")
+        assert lines[-1] == ""
+        assert json.loads(lines[0])["index"]["_index"].startswith("traces-")
+        assert json.loads(lines[1]) == {"name": "a"}
+        assert lines[2] == lines[0]
+        assert json.loads(lines[3]) == {"name": "b"}
+    
+    def test_bulk_endpoint_used(self, http_server):
+        """Test batches go to _bulk as gzipped NDJSON."""
+        exporter = ElasticsearchExporter(hosts=[http_server.url], index="traces")
+        batch = [{"name": f"span-{i}", "prompt": "x" * 100} for i in range(10)]
+        
+        assert exporter._send_batch(batch) is True
+        exporter.stop()
         
-        assert host1 == "http://es1:9200"
-        assert host2 == "http://es2:9200"
-        assert host3 == "http://es3:9200"
-        assert host4 == "http://es1:9200"  # Wraps around
+        request = http_server.requests[0]
+        assert request["path"] == "/_bulk"
+        assert request["headers"]["Content-Type"] == "application/x-ndjson"
+        assert request["headers"]["Content-Encoding"] == "gzip"
+        lines = gzip.decompress(request["body"]).decode().splitlines()
+        assert [json.loads(line)["name"] for line in lines[1::2]] == [f"span-{i}" for i in range(10)]
+    
+    def test_stream_sends_chunked_bulk_body(self, http_server):
+        """Test stream=True sends the bulk body chunked, encoded while sent."""
+        exporter = ElasticsearchExporter(hosts=[http_server.url], index="traces", stream=True)
+        batch = [{"name": f"span-{i}", "prompt": "x" * 1000} for i in range(200)]
+        
+        stream = _BulkStream(exporter._get_bulk_action(), batch)
+        chunks = list(stream)
+        assert len(chunks) > 1
+        assert list(stream) == chunks  # re-iterable for retries
+        
+        assert exporter._send_batch(batch) is True
+        exporter.stop()
+        
+        request = http_server.requests[0]
+        assert request["path"] == "/_bulk"
+        assert request["headers"]["Transfer-Encoding"] == "chunked"
+        assert request["headers"]["Content-Encoding"] == "gzip"
+        assert request["headers"]["Content-Type"] == "application/x-ndjson"
+        lines = gzip.decompress(request["body"]).decode().splitlines()
+        assert [json.loads(line)["name"] for line in lines[1::2]] == [f"span-{i}" for i in range(200)]
     
     def test_headers_with_api_key(self):
         """Test headers include API key auth."""
@@ -315,3 +1109,594 @@ class TestElasticsearchExporter:
         
         assert "Authorization" in headers
         assert headers["Authorization"].startswith("Basic ")
+    
+    def test_headers_are_built_once(self):
+        """Test that each content type reuses one prebuilt headers dict."""
+        exporter = ElasticsearchExporter(hosts=["http://localhost:9200"], api_key="k")
+        
+        assert exporter._get_headers() is exporter._get_headers()
+        bulk = exporter._get_headers("application/x-ndjson")
+        assert bulk == {"Content-Type": "application/x-ndjson", "Authorization": "ApiKey k"}
+    
+    def test_hosts_strip_trailing_slash(self):
+        """Test hosts are used without trailing slashes."""
+        exporter = ElasticsearchExporter(hosts=["http://es1:9200/", "http://es2:9200"])
+        
+        assert exporter._get_host() == "http://es1:9200"
+
+
+class TestOTLPExporter:
+    """Tests for OTLP exporter."""
+    
+    def test_batches_reuse_connection(self, http_server):
+        """Test consecutive batches share one keep-alive connection."""
+        exporter = OTLPExporter(endpoint=http_server.url, batch_size=1)
+        
+        assert exporter.export({"name": "a"}) is True
+        assert exporter.export({"name": "b"}) is True
+        exporter.stop()
+        
+        clients = [r["client"] for r in http_server.requests]
+        assert [r["path"] for r in http_server.requests] == ["/v1/traces", "/v1/traces"]
+        assert clients[0] == clients[1]
+    
+    def test_concurrent_exports_are_not_lost(self):
+        """Test spans appended from many threads without a lock are each sent once."""
+        exporter = OTLPExporter(batch_size=7)
+        sent = []
+        exporter._send_batch = lambda batch: sent.extend(batch) or True
+        
+        def produce(worker):
+            for i in range(100):
+                exporter.export({"name": f"{worker}-{i}"})
+        
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        exporter.flush()
+        
+        assert sorted(s["name"] for s in sent) == sorted(
+            f"{w}-{i}" for w in range(4) for i in range(100)
+        )
+    
+    def test_full_batch_is_sent_off_the_caller_thread(self):
+        """Test a full batch is handed to the flush thread instead of sent inline."""
+        exporter = OTLPExporter(batch_size=2, flush_interval=60)
+        sent = threading.Event()
+        senders = []
+        exporter._send_batch = lambda batch: senders.append(threading.current_thread()) or sent.set() or True
+        exporter.start()
+        
+        exporter.export({"name": "a"})
+        exporter.export({"name": "b"})
+        
+        assert sent.wait(2)
+        assert senders[0] is not threading.current_thread()
+        exporter.stop()
+    
+    def test_export_span_defers_to_dict_to_flush(self):
+        """Test queued Span objects are only converted to dicts when flushed."""
+        from genai_telemetry.core.span import Span
+        
+        exporter = OTLPExporter(batch_size=10)
+        sent = []
+        exporter._send_batch = lambda batch: sent.extend(batch) or True
+        span = Span(trace_id="t", span_id="s", name="deferred", span_type="LLM")
+        span.finish()
+        
+        with patch.object(Span, "to_dict", wraps=span.to_dict) as to_dict:
+            assert exporter.export_span(span) is True
+            assert exporter.export({"name": "plain"}) is True
+            to_dict.assert_not_called()
+            
+            exporter.flush()
+            to_dict.assert_called_once()
+        
+        assert [s["name"] for s in sent] == ["deferred", "plain"]
+    
+    def test_queue_drops_oldest_when_full(self):
+        """Test the pending queue is bounded and counts dropped spans."""
+        exporter = OTLPExporter(batch_size=3, max_queue_size=3)
+        exporter.batch_size = 100  # never flush from export()
+        
+        for i in range(5):
+            exporter.export({"name": f"span_{i}"})
+        
+        assert [s["name"] for s in exporter._batch] == ["span_2", "span_3", "span_4"]
+        assert exporter.dropped == 2
+        assert exporter.health_check() is False
+        assert exporter.health_check() is True
+        exporter._batch.clear()
+    
+    def test_span_start_time_ns_is_used_directly(self):
+        """Test spans from Span.to_dict() keep their exact start time and skip re-parsing."""
+        from genai_telemetry.core.span import Span
+        
+        span = Span(trace_id="t", span_id="s", name="n", span_type="LLM")
+        span.finish()
+        
+        otlp_span = OTLPExporter()._convert_to_otlp([span.to_dict()])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        
+        assert otlp_span["startTimeUnixNano"] == str(span.start_time_ns)
+        assert "start_time_ns" not in {a["key"] for a in otlp_span["attributes"]}
+    
+    def test_iso_timestamp_keeps_microseconds(self):
+        """Test ISO timestamps convert to nanoseconds without float rounding."""
+        payload = OTLPExporter()._convert_to_otlp([{"timestamp": "2024-05-01T12:00:00.123457+00:00"}])
+        
+        start = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["startTimeUnixNano"]
+        assert start == "1714564800123457000"
+    
+    def test_attribute_value_types(self):
+        """Test attribute values map to the matching OTLP AnyValue variant."""
+        import enum
+        
+        class Level(enum.IntEnum):
+            HIGH = 2
+        
+        span = {
+            "ok": True, "tokens": 7, "big": 10**12, "negative": -3, "cost": 0.5,
+            "model": "gpt-4o", "level": Level.HIGH, "extra": None,
+        }
+        otlp_span = OTLPExporter()._convert_to_otlp([span])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        
+        assert {a["key"]: a["value"] for a in otlp_span["attributes"]} == {
+            "ok": {"boolValue": True},
+            "tokens": {"intValue": "7"},
+            "big": {"intValue": "1000000000000"},
+            "negative": {"intValue": "-3"},
+            "cost": {"doubleValue": 0.5},
+            "model": {"stringValue": "gpt-4o"},
+            "level": {"intValue": "2"},
+            "extra": {"stringValue": "None"},
+        }
+    
+    def test_resource_and_scope_are_built_once(self):
+        """Test batches share the exporter's resource and scope instead of rebuilding them."""
+        exporter = OTLPExporter(service_name="svc")
+        
+        first = exporter._convert_to_otlp([{"name": "a"}])["resourceSpans"][0]
+        second = exporter._convert_to_otlp([{"name": "b"}])["resourceSpans"][0]
+        
+        assert first["resource"] is second["resource"]
+        assert first["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "svc"}}]
+        assert first["scopeSpans"][0]["scope"]["name"] == "genai-telemetry"
+        assert first["scopeSpans"][0]["spans"][0]["name"] == "a"
+        assert second["scopeSpans"][0]["spans"][0]["name"] == "b"
+    
+    def test_protobuf_encoding(self):
+        """Test the protobuf payload follows the OTLP trace schema."""
+        exporter = OTLPExporter(protocol="http/protobuf")
+        
+        data = exporter._encode_otlp_proto([{
+            "trace_id": "0af7651916cd43dd8448eb211c80319c",
+            "span_id": "b7ad6b7169203331",
+            "parent_span_id": "00f067aa0ba902b7",
+            "name": "chat",
+            "timestamp": "2024-01-01T00:00:00Z",
+            "duration_ms": 2,
+            "is_error": 1,
+            "model_name": "gpt-4o",
+            "input_tokens": 10,
+            "temperature": 0.5,
+        }])
+        
+        resource_spans = _decode_proto(_decode_proto(data)[1][0])
+        resource = _decode_proto(resource_spans[1][0])
+        service = _decode_proto(resource[1][0])
+        assert service[1] == [b"service.name"]
+        assert _decode_proto(service[2][0])[1] == [b"genai-app"]
+        
+        scope_spans = _decode_proto(resource_spans[2][0])
+        assert _decode_proto(scope_spans[1][0])[1] == [b"genai-telemetry"]
+        span = _decode_proto(scope_spans[2][0])
+        assert span[1] == [bytes.fromhex("0af7651916cd43dd8448eb211c80319c")]
+        assert span[2] == [bytes.fromhex("b7ad6b7169203331")]
+        assert span[4] == [bytes.fromhex("00f067aa0ba902b7")]
+        assert span[5] == [b"chat"]
+        assert span[6] == [1]
+        assert struct.unpack("<Q", span[7][0])[0] == 1704067200000000000
+        assert struct.unpack("<Q", span[8][0])[0] == 1704067200002000000
+        assert _decode_proto(span[15][0])[3] == [2]
+        
+        attributes = {}
+        for kv in span[9]:
+            kv = _decode_proto(kv)
+            attributes[kv[1][0]] = _decode_proto(kv[2][0])
+        assert attributes[b"model_name"] == {1: [b"gpt-4o"]}
+        assert attributes[b"input_tokens"] == {3: [10]}
+        assert struct.unpack("<d", attributes[b"temperature"][4][0])[0] == 0.5
+    
+    def test_protobuf_content_type(self, http_server):
+        """Test protobuf batches are posted as application/x-protobuf."""
+        exporter = OTLPExporter(endpoint=http_server.url, protocol="http/protobuf", batch_size=1)
+        
+        assert exporter.export({"name": "step", "trace_id": "not-hex"}) is True
+        exporter.stop()
+        
+        request = http_server.requests[0]
+        assert request["path"] == "/v1/traces"
+        assert request["headers"]["Content-Type"] == "application/x-protobuf"
+    
+    def test_spans_without_timestamp_share_batch_time(self):
+        """Test untimed spans use one clock read per batch, or their own start_time_ns."""
+        exporter = OTLPExporter()
+        
+        payload = exporter._convert_to_otlp([
+            {"name": "a", "duration_ms": 1},
+            {"name": "b"},
+            {"name": "c", "start_time_ns": 123},
+            {"name": "d", "timestamp": "2024-01-01T00:00:00Z"},
+        ])
+        
+        spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        starts = [s["startTimeUnixNano"] for s in spans]
+        assert starts[0] == starts[1]
+        assert spans[0]["endTimeUnixNano"] == str(int(starts[0]) + 1_000_000)
+        assert starts[2] == "123"
+        assert starts[3] == "1704067200000000000"
+
+
+class TestCloudWatchExporter:
+    """Tests for CloudWatch exporter."""
+    
+    def test_streams_are_sharded(self):
+        """Test log streams are derived from the base stream name."""
+        exporter = CloudWatchExporter(log_stream="genai", num_streams=3)
+        
+        assert exporter.log_streams == ["genai-0", "genai-1", "genai-2"]
+    
+    def test_single_stream_keeps_name(self):
+        """Test a single stream uses the configured name as-is."""
+        exporter = CloudWatchExporter(log_stream="genai", num_streams=1)
+        
+        assert exporter.log_streams == ["genai"]
+    
+    def test_default_is_single_stream(self):
+        """Test a configured stream name is not suffixed unless sharding is requested."""
+        exporter = CloudWatchExporter(log_stream="my-stream")
+        
+        assert exporter.num_streams == 1
+        assert exporter.log_streams == ["my-stream"]
+    
+    def test_log_stream_can_be_reassigned(self):
+        """Test setting log_stream renames the shard streams."""
+        exporter = CloudWatchExporter(log_stream="old", num_streams=2)
+        assert exporter.log_streams == ["old-0", "old-1"]
+        
+        exporter.log_stream = "new"
+        
+        assert exporter.log_stream == "new"
+        assert exporter.log_streams == ["new-0", "new-1"]
+    
+    def test_auto_stream_name_rolls_over_daily(self):
+        """Test auto-generated stream names follow the current UTC date."""
+        exporter = CloudWatchExporter(num_streams=1)
+        
+        with patch("time.time", return_value=86400 * 365):
+            assert exporter.log_stream == "genai-1971-01-01"
+        with patch("time.time", return_value=86400 * 366):
+            assert exporter.log_stream == "genai-1971-01-02"
+            assert exporter.log_streams == ["genai-1971-01-02"]
+    
+    def test_send_batch_round_robins_streams(self):
+        """Test consecutive batches go to different streams with their own tokens."""
+        mock_client = MagicMock()
+        mock_client.put_log_events.return_value = {"nextSequenceToken": "next"}
+        mock_boto3 = MagicMock()
+        mock_boto3.client.return_value = mock_client
+        
+        exporter = CloudWatchExporter(log_stream="genai", num_streams=2)
+        
+        with patch.dict(sys.modules, {"boto3": mock_boto3}):
+            assert exporter._send_batch([{"name": "a"}]) is True
+            assert exporter._send_batch([{"name": "b"}]) is True
+        
+        streams = [c.kwargs["logStreamName"] for c in mock_client.put_log_events.call_args_list]
+        assert streams == ["genai-0", "genai-1"]
+        assert exporter._sequence_tokens == ["next", "next"]
+    
+    def test_queue_drops_oldest_when_full(self):
+        """Test the batch queue is bounded and counts dropped logs."""
+        exporter = CloudWatchExporter(batch_size=100, max_queue_size=3)
+        
+        for i in range(5):
+            exporter.export({"name": f"span_{i}"})
+        
+        assert [s["name"] for s in exporter._batch] == ["span_2", "span_3", "span_4"]
+        assert exporter.dropped == 2
+        assert exporter.health_check() is False
+        assert exporter.health_check() is True
+        exporter._batch.clear()
+    
+    def test_missing_boto3_disables_exporter(self):
+        """Test a missing boto3 is detected once and no flushes are scheduled."""
+        exporter = CloudWatchExporter(batch_size=10)
+        
+        with patch.dict(sys.modules, {"boto3": None}):
+            exporter.start()
+            assert exporter._flush_handle is None
+            assert exporter._send_batch([{"name": "a"}]) is False
+        
+        assert exporter._available is False
+        exporter.stop()
+
+
+class TestPrometheusExporter:
+    """Tests for Prometheus exporter."""
+    
+    def test_pushes_reuse_connection(self, http_server):
+        """Test consecutive pushes share one keep-alive connection."""
+        exporter = PrometheusExporter(pushgateway_url=http_server.url, push_interval=0)
+        
+        assert exporter.export({"model_name": "gpt-4o", "duration_ms": 10}) is True
+        assert exporter.export({"model_name": "gpt-4o", "duration_ms": 20}) is True
+        exporter.stop()
+        
+        clients = [r["client"] for r in http_server.requests]
+        assert http_server.requests[0]["path"] == "/metrics/job/genai_telemetry"
+        assert b"llm_requests_total" in http_server.requests[1]["body"]
+        assert clients[0] == clients[1]
+    
+    def test_failed_push_is_retried_on_stop(self):
+        """Test a failed interval push leaves the metrics pending for stop()."""
+        exporter = PrometheusExporter(pushgateway_url="http://gw:9091")
+        exporter._http = MagicMock()
+        exporter._http.request.side_effect = [HTTPStatusError("u", 503, "Unavailable"), 200]
+        
+        exporter.export({"model_name": "gpt-4o"})
+        exporter.flush()
+        assert exporter._dirty is True
+        exporter.stop()
+        
+        assert exporter._http.request.call_count == 2
+        assert b"llm_requests_total" in exporter._http.request.call_args.kwargs["body"]
+        assert exporter._dirty is False
+    
+    def test_exports_are_pushed_once_per_interval(self, http_server):
+        """Test exports only update counters and one push carries every series."""
+        exporter = PrometheusExporter(pushgateway_url=http_server.url)
+        
+        exporter.export({"model_name": "gpt-4o", "workflow_name": "chat", "input_tokens": 3})
+        exporter.export({"model_name": "gpt-4o", "workflow_name": "chat", "input_tokens": 4, "is_error": True})
+        exporter.export({"model_name": "claude", "workflow_name": "rag"})
+        assert http_server.requests == []
+        
+        exporter.flush()
+        exporter.flush()  # nothing changed, so nothing is pushed
+        exporter.stop()
+        
+        assert len(http_server.requests) == 1
+        lines = http_server.requests[0]["body"].decode().splitlines()
+        assert 'llm_requests_total{model="gpt-4o",provider="unknown",workflow="chat"} 2' in lines
+        assert 'llm_requests_total{model="claude",provider="unknown",workflow="rag"} 1' in lines
+        assert 'llm_errors_total{model="gpt-4o",provider="unknown",workflow="chat"} 1' in lines
+        assert 'llm_input_tokens_total{model="gpt-4o",provider="unknown"} 7' in lines
+    
+    def test_duration_histogram_buckets(self):
+        """Test durations are counted into cumulative buckets instead of stored."""
+        exporter = PrometheusExporter()
+        exporter._http = MagicMock()
+        exporter._http.request.return_value = 200
+        
+        for duration_ms in (50, 100, 700, 120_000):
+            exporter.export({"model_name": "gpt-4o", "duration_ms": duration_ms})
+        exporter.flush()
+        
+        lines = exporter._http.request.call_args.kwargs["body"].decode().splitlines()
+        labels = 'model="gpt-4o",provider="unknown"'
+        assert f'llm_request_duration_seconds_bucket{{{labels},le="0.1"}} 2' in lines
+        assert f'llm_request_duration_seconds_bucket{{{labels},le="1.0"}} 3' in lines
+        assert f'llm_request_duration_seconds_bucket{{{labels},le="60.0"}} 3' in lines
+        assert f'llm_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4' in lines
+        assert f'llm_request_duration_seconds_count{{{labels}}} 4' in lines
+        assert f'llm_request_duration_seconds_sum{{{labels}}} 120.85' in lines
+    
+    def test_per_span_push_takes_lock_once(self):
+        """Test an export updates and snapshots under a single lock acquisition."""
+        class CountingLock:
+            def __init__(self):
+                self.acquired = 0
+                self._lock = threading.Lock()
+            
+            def __enter__(self):
+                self.acquired += 1
+                return self._lock.__enter__()
+            
+            def __exit__(self, *exc):
+                return self._lock.__exit__(*exc)
+        
+        exporter = PrometheusExporter(push_interval=0)
+        exporter._http = MagicMock()
+        exporter._http.request.return_value = 200
+        exporter._lock = CountingLock()
+        
+        assert exporter.export({"model_name": "gpt-4o"}) is True
+        
+        assert exporter._lock.acquired == 1
+        assert b"llm_requests_total" in exporter._http.request.call_args.kwargs["body"]
+    
+    def test_basic_auth_headers(self):
+        """Test credentials are sent as a basic auth header to the job URL."""
+        exporter = PrometheusExporter(pushgateway_url="http://gw:9091/", username="u", password="p", push_interval=0)
+        exporter._http = MagicMock()
+        exporter._http.request.return_value = 200
+        
+        assert exporter.export({"model_name": "gpt-4o"}) is True
+        
+        args, kwargs = exporter._http.request.call_args
+        assert args == ("POST", "http://gw:9091/metrics/job/genai_telemetry")
+        assert kwargs["headers"]["Authorization"] == "Basic dTpw"
+    
+    def test_label_values_are_escaped(self):
+        """Test quotes and backslashes in label values are escaped."""
+        exporter = PrometheusExporter()
+        exporter._http = MagicMock()
+        exporter._http.request.return_value = 200
+        
+        exporter.export({"model_name": 'my "model"\\v1'})
+        exporter.flush()
+        
+        body = exporter._http.request.call_args.kwargs["body"].decode()
+        assert 'model="my \\"model\\"\\\\v1"' in body
+
+
+class TestLokiExporter:
+    """Tests for Loki exporter."""
+    
+    def test_export_posts_to_push_api(self, http_server):
+        """Test spans are pushed to the Loki push endpoint."""
+        exporter = LokiExporter(url=http_server.url, batch_size=1)
+        
+        assert exporter.export({"span_type": "LLM", "name": "chat"}) is True
+        exporter.stop()
+        
+        request = http_server.requests[0]
+        assert request["path"] == "/loki/api/v1/push"
+        stream = json.loads(request["body"])["streams"][0]
+        assert stream["stream"]["span_type"] == "LLM"
+    
+    def test_large_batch_is_gzipped(self, http_server):
+        """Test large payloads are sent with gzip Content-Encoding."""
+        exporter = LokiExporter(url=http_server.url, batch_size=1)
+        
+        assert exporter.export({"span_type": "LLM", "name": "x" * 2048}) is True
+        exporter.stop()
+        
+        request = http_server.requests[0]
+        assert request["headers"]["Content-Encoding"] == "gzip"
+        payload = json.loads(gzip.decompress(request["body"]))
+        assert len(payload["streams"]) == 1
+    
+    def test_spans_grouped_by_cached_labels(self):
+        """Test spans sharing labels land in one stream and the labels are cached."""
+        exporter = LokiExporter(url="http://loki:3100", batch_size=1)
+        pushed = []
+        exporter._http.request = lambda method, url, body, headers: pushed.append(body) or 204
+        
+        exporter._send_batch([
+            {"span_type": "LLM", "model_name": "gpt-4o"},
+            {"span_type": "LLM", "model_name": "gpt-4o"},
+            {"span_type": "TOOL"},
+        ])
+        exporter._send_batch([{"span_type": "LLM", "model_name": "gpt-4o"}])
+        
+        streams = json.loads(pushed[0])["streams"]
+        assert sorted(len(s["values"]) for s in streams) == [1, 2]
+        assert streams[0]["stream"]["job"] == "genai-telemetry"
+        assert json.loads(streams[0]["values"][0][1]) == {"span_type": "LLM", "model_name": "gpt-4o"}
+        assert len(exporter._label_cache) == 2
+
+
+class TestDatadogExporter:
+    """Tests for Datadog exporter."""
+    
+    def test_queue_drops_oldest_when_backend_stalls(self, caplog):
+        """Test the pending queue is bounded and drops are reported."""
+        exporter = DatadogExporter(api_key="key", batch_size=5, max_batch_size=5, max_queue_size=5)
+        exporter._batch_target = lambda: 100  # never flush from export()
+        sent = []
+        exporter._send_batch = lambda batch: sent.extend(batch) or True
+        
+        for i in range(7):
+            exporter.export({"name": str(i)})
+        with caplog.at_level("WARNING", logger="genai_telemetry.exporters.datadog"):
+            exporter.flush()
+        
+        assert [s["name"] for s in sent] == ["2", "3", "4", "5", "6"]
+        assert exporter.dropped == 2
+        assert "Dropped 2 spans" in caplog.text
+        assert exporter.health_check() is False
+        assert exporter.health_check() is True
+    
+    def test_concurrent_exports_are_not_lost(self):
+        """Test spans appended from many threads are each sent exactly once."""
+        exporter = DatadogExporter(api_key="key", batch_size=7)
+        sent = []
+        exporter._send_batch = lambda batch: sent.extend(batch) or True
+        
+        def produce(worker):
+            for i in range(100):
+                exporter.export({"name": f"{worker}-{i}"})
+        
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        exporter.flush()
+        
+        assert sorted(s["name"] for s in sent) == sorted(
+            f"{w}-{i}" for w in range(4) for i in range(100)
+        )
+    
+    def test_full_batch_is_sent_off_the_caller_thread(self):
+        """Test a full batch is handed to the flush thread once started."""
+        exporter = DatadogExporter(api_key="key", batch_size=2, flush_interval=60)
+        sent = threading.Event()
+        senders = []
+        
+        def send_batch(batch):
+            senders.append(threading.current_thread())
+            sent.set()
+            return True
+        
+        exporter._send_batch = send_batch
+        exporter.start()
+        exporter.export({"name": "a"})
+        exporter.export({"name": "b"})
+        
+        assert sent.wait(2)
+        assert senders[0] is not threading.current_thread()
+        exporter.stop()
+    
+    def test_batch_target_grows_while_sends_in_flight(self):
+        """Test the flush threshold scales with in-flight requests up to the cap."""
+        exporter = DatadogExporter(api_key="key", batch_size=10, max_batch_size=25)
+        
+        assert exporter._batch_target() == 10
+        exporter._in_flight = 1
+        assert exporter._batch_target() == 20
+        exporter._in_flight = 5
+        assert exporter._batch_target() == 25
+    
+    def test_large_batch_is_split_into_requests(self):
+        """Test a batch over max_batch_size is sent as several requests."""
+        exporter = DatadogExporter(api_key="key", batch_size=2, max_batch_size=2)
+        posts = []
+        exporter._post = lambda logs: posts.append(len(logs)) or True
+        
+        assert exporter._send_batch([{"name": str(i)} for i in range(5)]) is True
+        assert posts == [2, 2, 1]
+    
+    def test_batch_bytes_count_encoded_entries(self):
+        """Test requests stay under max_batch_bytes once messages are escaped."""
+        exporter = DatadogExporter(api_key="key", max_batch_bytes=2000, compress=False)
+        exporter._http = MagicMock()
+        exporter._http.request.return_value = 202
+        
+        spans = [{"name": f"span-{i}", "prompt": '"quoted" ' * 20} for i in range(20)]
+        assert exporter._send_batch(spans) is True
+        
+        bodies = [c.kwargs["body"] for c in exporter._http.request.call_args_list]
+        assert len(bodies) > 1
+        assert all(len(body) <= 2000 for body in bodies)
+        assert sum(len(json.loads(body)) for body in bodies) == 20
+    
+    def test_send_batch_payload(self):
+        """Test the Datadog log payload fields."""
+        exporter = DatadogExporter(api_key="key", service_name="svc", env="dev", compress=False)
+        exporter._http = MagicMock()
+        exporter._http.request.return_value = 202
+        
+        span = {"span_type": "LLM", "model_name": "gpt-4o", "workflow_name": "wf"}
+        assert exporter._send_batch([span]) is True
+        
+        body = exporter._http.request.call_args.kwargs["body"]
+        log = json.loads(body)[0]
+        assert log["ddtags"] == "env:dev,service:svc,span_type:LLM,model:gpt-4o"
+        assert log["hostname"] == "wf"
+        assert log["service"] == "svc"
+        assert json.loads(log["message"]) == span